@@ -0,0 +1,254 @@
+#!/usr/bin/python3
+
+import argparse
+import configparser
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from mysql_comparer import DatabaseModel, DatabaseController
+
+SCENARIOS = {
+    'wide': {
+        'columns': ["id BIGINT NOT NULL PRIMARY KEY"] +
+                   [f"i{n} INT NOT NULL" for n in range(20)] +
+                   [f"s{n} VARCHAR(64) NOT NULL" for n in range(20)] +
+                   [f"d{n} DECIMAL(12,2) NOT NULL" for n in range(10)] +
+                   ["updated_at DATETIME NOT NULL"],
+        'values': ["n"] +
+                  [f"(n * {n + 7}) % 100000" for n in range(20)] +
+                  [f"SHA1(CONCAT(n, '-{n}'))" for n in range(20)] +
+                  [f"(n % 10000) / 100 + {n}" for n in range(10)] +
+                  ["'2024-01-01 00:00:00' + INTERVAL (n % 86400) SECOND"],
+        'key': "id",
+        'mutate': "i0 = i0 + 1"
+    },
+    'blob': {
+        'columns': ["id BIGINT NOT NULL PRIMARY KEY", "name VARCHAR(64) NOT NULL", "payload MEDIUMBLOB NOT NULL"],
+        'values': ["n", "CONCAT('row-', n)", "REPEAT(SHA1(n), 200)"],
+        'key': "id",
+        'mutate': "payload = REPEAT(SHA1(id + 1), 200)"
+    },
+    'composite': {
+        'columns': ["tenant_id INT NOT NULL", "id BIGINT NOT NULL", "status VARCHAR(16) NOT NULL",
+                    "amount DECIMAL(12,2) NOT NULL", "PRIMARY KEY (tenant_id, id)"],
+        'values': ["n % 97", "n", "ELT(1 + n % 4, 'new', 'paid', 'shipped', 'closed')", "(n % 100000) / 100"],
+        'key': "CONCAT(tenant_id, ':', id)",
+        'mutate': "status = 'changed'"
+    }
+}
+
+STRATEGIES = {
+    'batched': {'fetch_strategy': 'batched', 'fetch_mode': 'typed'},
+    'fast': {'fetch_strategy': 'fast', 'fetch_mode': 'typed'},
+    'batched-raw': {'fetch_strategy': 'batched', 'fetch_mode': 'raw'},
+    'fast-raw': {'fetch_strategy': 'fast', 'fetch_mode': 'raw'}
+}
+
+def run_compare_states(controller):
+    controller.set_fast_mode(False)
+    return controller.compare_states()
+
+def run_compare_states_fast(controller):
+    return controller.compare_states_fast()
+
+ENGINES = {
+    'compare_states': run_compare_states,
+    'compare_states_fast': run_compare_states_fast
+}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark MySQL Comparer fetch strategies and diff engines on synthetic tables.")
+    parser.add_argument('--config', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.ini'))
+    parser.add_argument('--host')
+    parser.add_argument('--user')
+    parser.add_argument('--password')
+    parser.add_argument('--database', required=True, help="Scratch database; bench_* tables in it are dropped and recreated")
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--rows', default='1000000', help="Comma-separated row counts, e.g. 1000000,10000000,100000000")
+    parser.add_argument('--mutation-rates', default='0.0001,0.01,0.1')
+    parser.add_argument('--strategies', default=','.join(STRATEGIES))
+    parser.add_argument('--engines', default=','.join(ENGINES))
+    parser.add_argument('--batch-size', type=int, help="Fixed batch size; adaptive sizing from config.ini when omitted")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="Measure per-run peak memory with tracemalloc (slower); only the process-wide peak RSS is reported otherwise")
+    parser.add_argument('--keep-tables', action='store_true')
+    parser.add_argument('--output', help="Write JSON results to this file instead of stdout")
+    return parser.parse_args(argv)
+
+def write_bench_config(args, strategy=None):
+    config = configparser.ConfigParser()
+    config.read(args.config)
+    if not config.has_section('mysql'):
+        config.add_section('mysql')
+    for key in ('host', 'user', 'password', 'database'):
+        value = getattr(args, key)
+        if value is not None:
+            config['mysql'][key] = value
+        elif key not in config['mysql']:
+            config['mysql'][key] = ''
+    if strategy:
+        profile = config.get('performance', 'profile', fallback='').strip().lower()
+        section = f"profile:{profile}" if profile else 'performance'
+        if not config.has_section(section):
+            config.add_section(section)
+        config[section].update(STRATEGIES[strategy])
+    handle, path = tempfile.mkstemp(suffix='.ini', prefix='bench_')
+    with os.fdopen(handle, 'w') as configfile:
+        config.write(configfile)
+    return path
+
+def execute(model, statements):
+    conn = model.get_connection()
+    cursor = conn.cursor()
+    try:
+        for statement in statements:
+            cursor.execute(statement)
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+def sequence_sql(rows):
+    digits = max(1, len(str(max(rows - 1, 1))))
+    joins = ", ".join(f"bench_digits d{n}" for n in range(digits))
+    number = " + ".join(f"d{n}.d * {10 ** n}" for n in range(digits))
+    return f"SELECT {number} AS n FROM {joins} HAVING n < {rows}"
+
+def create_table(model, name, scenario, rows):
+    execute(model, [
+        "CREATE TABLE IF NOT EXISTS bench_digits (d TINYINT NOT NULL PRIMARY KEY)",
+        "INSERT IGNORE INTO bench_digits VALUES (0),(1),(2),(3),(4),(5),(6),(7),(8),(9)",
+        f"DROP TABLE IF EXISTS {name}",
+        f"CREATE TABLE {name} ({', '.join(scenario['columns'])})",
+        f"INSERT INTO {name} SELECT {', '.join(scenario['values'])} FROM ({sequence_sql(rows)}) seq"
+    ])
+
+def mutate_table(model, name, scenario, rows, rate):
+    threshold = int(rate * 1000000)
+    third = max(1, threshold // 3)
+    selector = f"CRC32({scenario['key']}) % 1000000"
+    inserts = max(1, int(rows * rate / 3))
+    execute(model, [
+        f"UPDATE {name} SET {scenario['mutate']} WHERE {selector} < {third}",
+        f"DELETE FROM {name} WHERE {selector} >= {third} AND {selector} < {2 * third}",
+        f"INSERT INTO {name} SELECT {', '.join(scenario['values'])} "
+        f"FROM (SELECT n + {rows} AS n FROM ({sequence_sql(inserts)}) fresh) seq"
+    ])
+
+def peak_memory():
+    if tracemalloc.is_tracing():
+        return {'peak_memory_bytes': tracemalloc.get_traced_memory()[1]}
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak = peak if sys.platform == 'darwin' else peak * 1024
+    except ImportError:
+        peak = 0
+    return {'peak_memory_bytes': None, 'process_peak_rss_bytes': peak}
+
+def timed(function):
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+def run_case(args, scenario_name, rows, rate, strategy, engine):
+    config_path = write_bench_config(args, strategy)
+    try:
+        model = DatabaseModel(config_path)
+    finally:
+        os.remove(config_path)
+    try:
+        return measure_case(model, args, scenario_name, rows, rate, strategy, engine)
+    finally:
+        model.connection_pool.close_all()
+
+def measure_case(model, args, scenario_name, rows, rate, strategy, engine):
+    scenario = SCENARIOS[scenario_name]
+    table = f"bench_{scenario_name}"
+    create_table(model, table, scenario, rows)
+    controller = DatabaseController(model)
+    controller.set_selected_tables([table])
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+    _, initial_time = timed(lambda: controller.fetch_initial_state(batch_size=args.batch_size))
+    initial_rows = sum(len(state) for state in controller.initial_state.values())
+    mutate_table(model, table, scenario, rows, rate)
+    _, current_time = timed(lambda: controller.fetch_current_state(batch_size=args.batch_size))
+    current_rows = sum(len(state) for state in controller.current_state.values())
+    differences, compare_time = timed(lambda: ENGINES[engine](controller))
+    report = controller.performance_report()
+    result = {
+        'scenario': scenario_name,
+        'rows': rows,
+        'mutation_rate': rate,
+        'strategy': strategy,
+        'engine': engine,
+        'batch_size': args.batch_size or 'auto',
+        'learned_batch_sizes': dict(model.batch_sizes),
+        'initial_fetch_seconds': initial_time,
+        'current_fetch_seconds': current_time,
+        'compare_seconds': compare_time,
+        'initial_rows_per_sec': initial_rows / initial_time if initial_time else 0.0,
+        'current_rows_per_sec': current_rows / current_time if current_time else 0.0,
+        'compare_rows_per_sec': max(initial_rows, current_rows) / compare_time if compare_time else 0.0,
+        'differences': len(differences) if differences is not None else None,
+        'phases': report['totals'],
+        'pool': report['pool']
+    }
+    result.update(peak_memory())
+    controller.clear_states()
+    return result
+
+def print_summary(results):
+    header = f"{'scenario':<10} {'rows':>11} {'rate':>7} {'strategy':<10} {'engine':<20} {'fetch r/s':>11} {'diff r/s':>11} {'total s':>9} {'peak MB':>8}"
+    print(header, file=sys.stderr)
+    for result in results:
+        total = result['initial_fetch_seconds'] + result['current_fetch_seconds'] + result['compare_seconds']
+        peak = result['peak_memory_bytes']
+        peak = f"{peak / (1024 * 1024):>8.0f}" if peak is not None else f"{'n/a':>8}"
+        print(
+            f"{result['scenario']:<10} {result['rows']:>11,} {result['mutation_rate']:>7.2%} {result['strategy']:<10} "
+            f"{result['engine']:<20} {result['current_rows_per_sec']:>11,.0f} {result['compare_rows_per_sec']:>11,.0f} "
+            f"{total:>9.2f} {peak}",
+            file=sys.stderr
+        )
+    if results and results[0]['peak_memory_bytes'] is None:
+        print("peak MB needs --trace-memory; process_peak_rss_bytes in the JSON is the process-wide peak, not per case.", file=sys.stderr)
+
+def main(argv=None):
+    args = parse_args(argv)
+    config_path = write_bench_config(args)
+    if args.trace_memory:
+        tracemalloc.start()
+    results = []
+    try:
+        model = DatabaseModel(config_path)
+        for scenario_name in args.scenarios.split(','):
+            for rows in [int(value) for value in args.rows.split(',')]:
+                for rate in [float(value) for value in args.mutation_rates.split(',')]:
+                    for strategy in args.strategies.split(','):
+                        for engine in args.engines.split(','):
+                            print(f"Running {scenario_name} rows={rows:,} rate={rate:.2%} {strategy}/{engine}...", file=sys.stderr)
+                            results.append(run_case(args, scenario_name, rows, rate, strategy, engine))
+        if not args.keep_tables:
+            execute(model, [f"DROP TABLE IF EXISTS bench_{name}" for name in SCENARIOS] + ["DROP TABLE IF EXISTS bench_digits"])
+    finally:
+        os.remove(config_path)
+    print_summary(results)
+    output = json.dumps({
+        'generated': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': sys.version.split()[0],
+        'results': results
+    }, indent=2, default=str)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(output)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -1,216 +1,2120 @@
 #!/usr/bin/python3
 
 import mysql.connector
-from mysql.connector import pooling
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import csv
 import configparser
 import os
 import threading
+import queue
 import json
+import difflib
+import hashlib
 from io import StringIO
 import re
 from functools import partial
 import time
 import sys
+from collections import deque, OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from bisect import bisect_right
+import tracemalloc
+import pickle
+import tempfile
+import shutil
+import weakref
+import zlib
+try:
+    import resource
+except ImportError:
+    resource = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+class PooledConnection:
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+    
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+    
+    def close(self):
+        if self._conn is not None:
+            self._pool.release(self._conn)
+            self._conn = None
+    
+    def reconnect(self):
+        if self._conn is not None:
+            self._conn = self._pool.reconnect(self._conn)
+    
+    def discard(self):
+        if self._conn is not None:
+            self._pool.release(self._conn, discard=True)
+            self._conn = None
+
+class ConnectionPool:
+    def __init__(self, connect_args, pool_size=5, timeout=30):
+        self.connect_args = connect_args
+        self.pool_size = max(1, pool_size)
+        self.timeout = timeout
+        self._idle = deque()
+        self._open = 0
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self.metrics = {
+            'checkouts': 0,
+            'created': 0,
+            'recreated': 0,
+            'timeouts': 0,
+            'wait_time': 0.0,
+            'max_wait': 0.0,
+            'peak_in_use': 0
+        }
+    
+    def _connect(self):
+        conn = mysql.connector.connect(**self.connect_args)
+        with self._cond:
+            self.metrics['created'] += 1
+        return conn
+    
+    def _validate(self, conn):
+        if conn is None:
+            return self._connect()
+        try:
+            conn.ping(reconnect=False)
+            return conn
+        except Exception:
+            try:
+                conn.close()
+            except Exception:
+                pass
+            with self._cond:
+                self.metrics['recreated'] += 1
+            return self._connect()
+    
+    def get_connection(self, timeout=None):
+        started = time.perf_counter()
+        if timeout is None:
+            timeout = self.timeout
+        deadline = started + timeout
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._open < self.pool_size:
+                    self._open += 1
+                    conn = None
+                    break
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self.metrics['timeouts'] += 1
+                    raise mysql.connector.errors.PoolError(
+                        f"No connection available within {timeout}s (pool size {self.pool_size})"
+                    )
+                self._cond.wait(remaining)
+            self._in_use += 1
+            self.metrics['peak_in_use'] = max(self.metrics['peak_in_use'], self._in_use)
+        try:
+            conn = self._validate(conn)
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        waited = time.perf_counter() - started
+        with self._cond:
+            self.metrics['checkouts'] += 1
+            self.metrics['wait_time'] += waited
+            self.metrics['max_wait'] = max(self.metrics['max_wait'], waited)
+        return PooledConnection(self, conn)
+    
+    def release(self, conn, discard=False):
+        if not discard:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+            except Exception:
+                discard = True
+        with self._cond:
+            self._in_use -= 1
+            if discard or self._open > self.pool_size:
+                self._open -= 1
+            else:
+                self._idle.append(conn)
+                conn = None
+            self._cond.notify()
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+    
+    def reconnect(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self.metrics['recreated'] += 1
+        return self._connect()
+    
+    def resize(self, pool_size):
+        with self._cond:
+            self.pool_size = max(1, pool_size)
+            while self._idle and self._open > self.pool_size:
+                conn = self._idle.popleft()
+                self._open -= 1
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._cond.notify_all()
+    
+    def close_all(self):
+        with self._cond:
+            while self._idle:
+                conn = self._idle.popleft()
+                self._open -= 1
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+    
+    def stats(self):
+        with self._cond:
+            stats = dict(self.metrics)
+            stats['pool_size'] = self.pool_size
+            stats['open'] = self._open
+            stats['in_use'] = self._in_use
+            stats['idle'] = len(self._idle)
+        stats['avg_wait'] = stats['wait_time'] / stats['checkouts'] if stats['checkouts'] else 0.0
+        return stats
+
+class SchemaCache:
+    def __init__(self, database):
+        self.database = database
+        self.tables = {}
+        self.columns = {}
+        self.keys = {}
+        self.lock = threading.Lock()
+        self.loaded = False
+    
+    def refresh(self, conn):
+        with self.lock:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SET SESSION information_schema_stats_expiry = 0")
+            except Exception:
+                pass
+            cursor.execute(
+                "SELECT TABLE_NAME, CREATE_TIME, UPDATE_TIME, TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = %s",
+                (self.database,)
+            )
+            tables = {}
+            for name, create_time, update_time, table_rows in cursor.fetchall():
+                tables[name] = {
+                    'create_time': str(create_time) if create_time is not None else None,
+                    'update_time': str(update_time) if update_time is not None else None,
+                    'table_rows': table_rows
+                }
+            stale = [
+                name for name, info in tables.items()
+                if name not in self.columns or not self.loaded or
+                (self.tables.get(name, {}).get('create_time'), self.tables.get(name, {}).get('update_time')) !=
+                (info['create_time'], info['update_time'])
+            ]
+            for name in list(self.columns):
+                if name not in tables:
+                    self.columns.pop(name, None)
+                    self.keys.pop(name, None)
+            self.tables = tables
+            if stale:
+                self._load_columns(cursor, stale if self.loaded else None)
+            cursor.close()
+            self.loaded = True
+            return stale
+    
+    def _table_filter(self, tables):
+        if tables is None:
+            return "", ()
+        return f" AND TABLE_NAME IN ({', '.join(['%s'] * len(tables))})", tuple(tables)
+    
+    def _load_columns(self, cursor, tables=None):
+        table_filter, params = self._table_filter(tables)
+        cursor.execute(
+            "SELECT TABLE_NAME, COLUMN_NAME, ORDINAL_POSITION, DATA_TYPE, COLUMN_TYPE, COLUMN_KEY, IS_NULLABLE "
+            "FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = %s" + table_filter +
+            " ORDER BY TABLE_NAME, ORDINAL_POSITION",
+            (self.database,) + params
+        )
+        columns = {}
+        for table, name, position, data_type, column_type, column_key, nullable in cursor.fetchall():
+            columns.setdefault(table, []).append({
+                'name': name,
+                'position': position,
+                'data_type': data_type,
+                'column_type': column_type,
+                'column_key': column_key,
+                'nullable': nullable == 'YES'
+            })
+        cursor.execute(
+            "SELECT TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX, COLUMN_NAME, NULLABLE FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = %s AND NON_UNIQUE = 0" + table_filter,
+            (self.database,) + params
+        )
+        indexes = {}
+        nullable_indexes = {}
+        for table, index_name, seq, column, nullable in cursor.fetchall():
+            indexes.setdefault(table, {}).setdefault(index_name, []).append((seq, column))
+            if nullable == 'YES':
+                nullable_indexes.setdefault(table, set()).add(index_name)
+        for table in (tables if tables is not None else columns.keys()):
+            if table in columns:
+                self.columns[table] = columns[table]
+                self.keys[table] = self._choose_key(indexes.get(table, {}), nullable_indexes.get(table, set()))
+    
+    def _choose_key(self, indexes, nullable):
+        if 'PRIMARY' in indexes:
+            return [col for _, col in sorted(indexes['PRIMARY'])]
+        candidates = [
+            [col for _, col in sorted(parts)]
+            for name, parts in indexes.items()
+            if name not in nullable
+        ]
+        if not candidates:
+            return []
+        return min(candidates, key=len)
+    
+    def column_names(self, table):
+        return [col['name'] for col in self.columns.get(table, [])]
+    
+    def schema(self, table):
+        return [[col['name'], col['column_type']] for col in self.columns.get(table, [])]
+    
+    def key(self, table):
+        return list(self.keys.get(table, []))
+    
+    def table_info(self, table):
+        return self.tables.get(table, {})
+
+class ProgressTracker:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+    
+    def reset(self, status=None):
+        with self.lock:
+            self.status = status or ""
+            self.progress = 0.0
+            self.started = time.perf_counter()
+            self.tables = {}
+            self.table = None
+    
+    def update(self, status=None, current=0, total=1, sub_progress=None, table=None, rows=None, total_rows=None, nbytes=None):
+        if total == 0:
+            progress = 100
+        elif sub_progress is not None:
+            progress = ((current + sub_progress) / total) * 100
+        else:
+            progress = (current / total) * 100
+        with self.lock:
+            self.progress = progress
+            if status:
+                self.status = status
+            if table is not None:
+                if table not in self.tables:
+                    self.tables[table] = {'rows': 0, 'total': 0, 'bytes': 0, 'started': time.perf_counter()}
+                entry = self.tables[table]
+                self.table = table
+                if rows is not None:
+                    entry['rows'] = rows
+                if total_rows is not None:
+                    entry['total'] = total_rows
+                if nbytes is not None:
+                    entry['bytes'] = nbytes
+    
+    def snapshot(self):
+        now = time.perf_counter()
+        with self.lock:
+            status = self.status
+            progress = self.progress
+            elapsed = now - self.started
+            rows = sum(entry['rows'] for entry in self.tables.values())
+            nbytes = sum(entry['bytes'] for entry in self.tables.values())
+            current = self.tables.get(self.table, {'rows': 0, 'total': 0, 'started': now})
+            table_elapsed = now - current['started']
+            table_rows = current['rows']
+            table_total = current['total']
+        table_eta = None
+        if table_rows > 0 and table_total > table_rows:
+            table_eta = (table_total - table_rows) * table_elapsed / table_rows
+        overall_eta = None
+        if 0 < progress < 100:
+            overall_eta = elapsed * (100 - progress) / progress
+        return {
+            'status': status,
+            'progress': progress,
+            'elapsed': elapsed,
+            'rows_per_sec': rows / elapsed if elapsed > 0 else 0.0,
+            'mb_per_sec': nbytes / elapsed / (1024 * 1024) if elapsed > 0 else 0.0,
+            'table_eta': table_eta,
+            'overall_eta': overall_eta
+        }
+
+class PerformanceRecorder:
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.lock = threading.Lock()
+        self.reset()
+    
+    def reset(self, stage=None):
+        with self.lock:
+            self.records = {}
+            self.order = []
+            self.stage = stage or ""
+            self.started = time.time()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+    
+    def set_stage(self, stage):
+        with self.lock:
+            self.stage = stage
+    
+    def begin(self, table, phase, stage=None):
+        with self.lock:
+            stage = self.stage if stage is None else stage
+            key = (stage, table, phase)
+            record = self.records.get(key)
+            if record is None:
+                record = {
+                    'stage': stage,
+                    'table': table,
+                    'phase': phase,
+                    'wall_time': 0.0,
+                    'rows': 0,
+                    'bytes': 0,
+                    'queries': 0,
+                    'wire_bytes': 0,
+                    'process_peak_memory': 0
+                }
+                self.records[key] = record
+                self.order.append(key)
+        return record, time.perf_counter()
+    
+    def end(self, token, rows=0, nbytes=0, queries=0, wire_bytes=0):
+        record, started = token
+        elapsed = time.perf_counter() - started
+        peak = self._process_peak_memory()
+        with self.lock:
+            record['wall_time'] += elapsed
+            record['rows'] += rows
+            record['bytes'] += nbytes
+            record['queries'] += queries
+            record['wire_bytes'] += wire_bytes
+            record['process_peak_memory'] = max(record['process_peak_memory'], peak)
+        return record
+    
+    @contextmanager
+    def phase(self, table, phase, stage=None):
+        token = self.begin(table, phase, stage)
+        counters = {'rows': 0, 'bytes': 0, 'queries': 0, 'wire_bytes': 0}
+        try:
+            yield counters
+        finally:
+            self.end(token, counters['rows'], counters['bytes'], counters['queries'], counters['wire_bytes'])
+    
+    def _process_peak_memory(self):
+        if self.trace_memory and tracemalloc.is_tracing():
+            return tracemalloc.get_traced_memory()[1]
+        if resource is not None:
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return peak if sys.platform == 'darwin' else peak * 1024
+        return 0
+    
+    def report(self, extra=None):
+        with self.lock:
+            records = [dict(self.records[key]) for key in self.order]
+        totals = {}
+        for record in records:
+            total = totals.setdefault(record['phase'], {'wall_time': 0.0, 'rows': 0, 'bytes': 0, 'queries': 0, 'wire_bytes': 0, 'process_peak_memory': 0})
+            total['wall_time'] += record['wall_time']
+            total['rows'] += record['rows']
+            total['bytes'] += record['bytes']
+            total['queries'] += record['queries']
+            total['wire_bytes'] += record['wire_bytes']
+            total['process_peak_memory'] = max(total['process_peak_memory'], record['process_peak_memory'])
+        report = {
+            'started': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started)),
+            'phases': records,
+            'totals': totals
+        }
+        if extra:
+            report.update(extra)
+        return report
+    
+    def write_json(self, path, extra=None):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as report_file:
+            json.dump(self.report(extra), report_file, indent=2, default=str)
+        return path
+
+class ChunkCodec:
+    def __init__(self, name):
+        if name == 'auto':
+            name = 'zstd' if zstandard else 'lz4' if lz4_frame else 'zlib'
+        if name == 'zstd' and zstandard:
+            self.compress = zstandard.ZstdCompressor(level=3).compress
+            self.decompress = zstandard.ZstdDecompressor().decompress
+        elif name == 'lz4' and lz4_frame:
+            self.compress = lz4_frame.compress
+            self.decompress = lz4_frame.decompress
+        else:
+            name = 'zlib'
+            self.compress = lambda data: zlib.compress(data, 1)
+            self.decompress = zlib.decompress
+        self.name = name
+
+class CompressedTableState:
+    def __init__(self, codec, chunk_rows=2000, spill_dir=None, cache_chunks=8):
+        self.codec = codec
+        self.chunk_rows = max(1, chunk_rows)
+        self.spill_dir = spill_dir
+        self.cache_chunks = cache_chunks
+        self.index = {}
+        self.digests = bytearray()
+        self.chunk_starts = []
+        self.chunks = []
+        self.pending = []
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+        self._cache = OrderedDict()
+        self._file = None
+        self._lock = threading.RLock()
+    
+    def __setitem__(self, key, row):
+        data = pickle.dumps(row, protocol=pickle.HIGHEST_PROTOCOL)
+        if not self.pending:
+            self.chunk_starts.append(len(self.digests) // 8)
+        self.index[key] = len(self.digests) // 8
+        self.digests += hashlib.blake2b(data, digest_size=8).digest()
+        self.pending.append(data)
+        self.raw_bytes += len(data)
+        if len(self.pending) >= self.chunk_rows:
+            self._flush()
+    
+    def _flush(self):
+        if not self.pending:
+            return
+        blob = self.codec.compress(pickle.dumps(self.pending, protocol=pickle.HIGHEST_PROTOCOL))
+        self.compressed_bytes += len(blob)
+        self.pending = []
+        if self.spill_dir is not None:
+            self.chunks.append(self._write(blob))
+        else:
+            self.chunks.append(blob)
+    
+    def _write(self, blob):
+        with self._lock:
+            if self._file is None:
+                self._file = tempfile.TemporaryFile(prefix='snapshot_', dir=self.spill_dir or None)
+            self._file.seek(0, os.SEEK_END)
+            offset = self._file.tell()
+            self._file.write(blob)
+            return (offset, len(blob))
+    
+    def finish(self):
+        self._flush()
+        return self
+    
+    def spill(self, spill_dir=None):
+        with self._lock:
+            self.spill_dir = spill_dir if spill_dir is not None else (self.spill_dir or "")
+            self._flush()
+            for chunk_id, chunk in enumerate(self.chunks):
+                if isinstance(chunk, bytes):
+                    self.chunks[chunk_id] = self._write(chunk)
+            self._cache.clear()
+    
+    def _load_chunk(self, chunk_id):
+        with self._lock:
+            rows = self._cache.get(chunk_id)
+            if rows is not None:
+                self._cache.move_to_end(chunk_id)
+                return rows
+            chunk = self.chunks[chunk_id]
+            if not isinstance(chunk, bytes):
+                offset, length = chunk
+                self._file.seek(offset)
+                chunk = self._file.read(length)
+        rows = pickle.loads(self.codec.decompress(chunk))
+        with self._lock:
+            self._cache[chunk_id] = rows
+            if len(self._cache) > self.cache_chunks:
+                self._cache.popitem(last=False)
+        return rows
+    
+    def position(self, key):
+        return self.index[key]
+    
+    def same_row(self, other, key):
+        mine = self.index[key] * 8
+        theirs = other.index[key] * 8
+        return self.digests[mine:mine + 8] == other.digests[theirs:theirs + 8]
+    
+    def __getitem__(self, key):
+        position = self.index[key]
+        chunk_id = bisect_right(self.chunk_starts, position) - 1
+        offset = position - self.chunk_starts[chunk_id]
+        if chunk_id == len(self.chunks):
+            return pickle.loads(self.pending[offset])
+        return pickle.loads(self._load_chunk(chunk_id)[offset])
+    
+    def __contains__(self, key):
+        return key in self.index
+    
+    def __len__(self):
+        return len(self.index)
+    
+    def __iter__(self):
+        return iter(self.index)
+    
+    def keys(self):
+        return self.index.keys()
+    
+    def get(self, key, default=None):
+        return self[key] if key in self.index else default
+    
+    def items(self):
+        for key, _ in sorted(self.index.items(), key=lambda item: item[1]):
+            yield key, self[key]
+    
+    def stats(self):
+        return {
+            'codec': self.codec.name,
+            'rows': len(self.index),
+            'chunks': len(self.chunks),
+            'raw_bytes': self.raw_bytes,
+            'compressed_bytes': self.compressed_bytes,
+            'on_disk': self._file is not None
+        }
+
+class MemoryGovernor:
+    def __init__(self, limit_bytes=0, spill_dir=None, interval=0.5):
+        self.limit_bytes = limit_bytes
+        self.spill_dir = spill_dir
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.states = weakref.WeakKeyDictionary()
+        self.last_check = 0.0
+        self.peak = 0
+        self.spills = 0
+        self.spilled_tables = 0
+        self.spilled_bytes = 0
+    
+    def current_memory(self):
+        try:
+            with open('/proc/self/statm') as statm:
+                return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, AttributeError):
+            pass
+        if psutil is not None:
+            return psutil.Process().memory_info().rss
+        return 0
+    
+    def register(self, state, meta=None):
+        if self.limit_bytes and isinstance(state, CompressedTableState) and state.spill_dir is None:
+            with self.lock:
+                self.states[state] = meta
+    
+    def check(self, active=None):
+        if not self.limit_bytes:
+            return False
+        now = time.perf_counter()
+        if now - self.last_check < self.interval:
+            return False
+        self.last_check = now
+        used = self.current_memory()
+        self.peak = max(self.peak, used)
+        if used <= self.limit_bytes:
+            return False
+        with self.lock:
+            victims = [(state, meta) for state, meta in self.states.items() if state.spill_dir is None]
+            self.states = weakref.WeakKeyDictionary()
+        if isinstance(active, CompressedTableState) and active.spill_dir is None:
+            victims.append((active, None))
+        for state, meta in victims:
+            state.spill(self.spill_dir or "")
+            self.spilled_bytes += state.compressed_bytes
+            if meta is not None:
+                meta['snapshot'] = state.stats()
+        if victims:
+            self.spills += 1
+            self.spilled_tables += len(victims)
+        return bool(victims)
+    
+    def stats(self):
+        return {
+            'limit_bytes': self.limit_bytes,
+            'current_bytes': self.current_memory() if self.limit_bytes else 0,
+            'peak_bytes': self.peak,
+            'spills': self.spills,
+            'spilled_tables': self.spilled_tables,
+            'spilled_bytes': self.spilled_bytes
+        }
+
+class ServerSideState:
+    def __init__(self, table, shadow=None, rows=0):
+        self.table = table
+        self.shadow = shadow
+        self.rows = rows
+    
+    def __len__(self):
+        return self.rows
+
+class SnapshotStore:
+    def __init__(self, directory, codec_name='zlib', chunk_rows=2000):
+        self.directory = directory
+        self.chunk_dir = os.path.join(directory, 'chunks')
+        self.codec_name = codec_name
+        self.chunk_rows = max(1, chunk_rows)
+        self.lock = threading.Lock()
+        self.pending = []
+    
+    def _chunk_path(self, digest):
+        return os.path.join(self.chunk_dir, digest[:2], digest)
+    
+    def _manifest_path(self, snapshot_id):
+        return os.path.join(self.directory, f"{snapshot_id}.json")
+    
+    def _is_boundary(self, key, count):
+        if count >= self.chunk_rows * 4:
+            return True
+        if count < self.chunk_rows // 4:
+            return False
+        marker = hashlib.blake2b(repr(key).encode(), digest_size=4).digest()
+        return int.from_bytes(marker, 'big') % self.chunk_rows == 0
+    
+    def _write_chunk(self, rows, codec, totals, pending):
+        payload = pickle.dumps(rows, protocol=pickle.HIGHEST_PROTOCOL)
+        digest = hashlib.sha256(payload).hexdigest()
+        path = self._chunk_path(digest)
+        with self.lock:
+            pending.add(digest)
+        totals['raw_bytes'] += len(payload)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            blob = codec.name.encode() + b'\n' + codec.compress(payload)
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'wb') as chunk_file:
+                chunk_file.write(blob)
+            os.replace(temp_path, path)
+            totals['stored_bytes'] += len(blob)
+            totals['new_chunks'] += 1
+        return {'hash': digest, 'rows': len(rows)}
+    
+    def _read_chunk(self, digest):
+        with open(self._chunk_path(digest), 'rb') as chunk_file:
+            codec_name, blob = chunk_file.read().split(b'\n', 1)
+        return pickle.loads(ChunkCodec(codec_name.decode()).decompress(blob))
+    
+    def save(self, states, columns, metas, label=None):
+        codec = ChunkCodec(self.codec_name)
+        created = time.time()
+        snapshot_id = time.strftime('%Y%m%d_%H%M%S', time.localtime(created)) + f"_{int(created * 1000) % 1000:03d}"
+        totals = {'raw_bytes': 0, 'stored_bytes': 0, 'new_chunks': 0, 'chunks': 0, 'rows': 0}
+        tables = {}
+        pending = set()
+        with self.lock:
+            self.pending.append(pending)
+        try:
+            for table, state in states.items():
+                if isinstance(state, ServerSideState):
+                    continue
+                chunks = []
+                rows = []
+                for key, row in state.items():
+                    rows.append((key, row))
+                    if self._is_boundary(key, len(rows)):
+                        chunks.append(self._write_chunk(rows, codec, totals, pending))
+                        rows = []
+                if rows:
+                    chunks.append(self._write_chunk(rows, codec, totals, pending))
+                totals['chunks'] += len(chunks)
+                totals['rows'] += len(state)
+                tables[table] = {
+                    'columns': list(columns.get(table) or []),
+                    'meta': {name: value for name, value in (metas.get(table) or {}).items() if name != 'snapshot'},
+                    'rows': len(state),
+                    'chunks': chunks
+                }
+            manifest = {
+                'id': snapshot_id,
+                'label': label or snapshot_id,
+                'created': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(created)),
+                'tables': tables,
+                'totals': totals
+            }
+            with self.lock:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(self._manifest_path(snapshot_id), 'w') as manifest_file:
+                    json.dump(manifest, manifest_file, default=str)
+        finally:
+            with self.lock:
+                self.pending.remove(pending)
+        return manifest
+    
+    def snapshots(self):
+        if not os.path.isdir(self.directory):
+            return []
+        snapshots = []
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as manifest_file:
+                    manifest = json.load(manifest_file)
+            except (OSError, ValueError):
+                continue
+            snapshots.append({
+                'id': manifest['id'],
+                'label': manifest['label'],
+                'created': manifest['created'],
+                'tables': len(manifest['tables']),
+                'rows': manifest['totals']['rows'],
+                'raw_bytes': manifest['totals']['raw_bytes'],
+                'stored_bytes': manifest['totals']['stored_bytes']
+            })
+        return snapshots
+    
+    def load(self, snapshot_id, tables=None):
+        with open(self._manifest_path(snapshot_id)) as manifest_file:
+            manifest = json.load(manifest_file)
+        states = {}
+        columns = {}
+        metas = {}
+        for table, entry in manifest['tables'].items():
+            if tables is not None and table not in tables:
+                continue
+            state = {}
+            for chunk in entry['chunks']:
+                for key, row in self._read_chunk(chunk['hash']):
+                    state[key] = row
+            states[table] = state
+            columns[table] = entry['columns']
+            metas[table] = entry['meta']
+        return states, columns, metas
+    
+    def delete(self, snapshot_id):
+        with self.lock:
+            os.remove(self._manifest_path(snapshot_id))
+            referenced = set().union(*self.pending)
+            for name in os.listdir(self.directory):
+                if name.endswith('.json'):
+                    with open(os.path.join(self.directory, name)) as manifest_file:
+                        manifest = json.load(manifest_file)
+                    for entry in manifest['tables'].values():
+                        referenced.update(chunk['hash'] for chunk in entry['chunks'])
+            freed = 0
+            if os.path.isdir(self.chunk_dir):
+                for prefix in os.listdir(self.chunk_dir):
+                    for digest in os.listdir(os.path.join(self.chunk_dir, prefix)):
+                        if digest not in referenced:
+                            path = self._chunk_path(digest)
+                            freed += os.path.getsize(path)
+                            os.remove(path)
+            return freed
+
+class FetchCheckpoint:
+    def __init__(self, directory, codec_name='auto', chunk_rows=50000):
+        self.directory = directory
+        self.codec = ChunkCodec(codec_name)
+        self.chunk_rows = max(1, chunk_rows)
+        self.lock = threading.Lock()
+        self.buffers = {}
+        self.manifest = self._read_manifest()
+    
+    def _manifest_path(self):
+        return os.path.join(self.directory, 'checkpoint.json')
+    
+    def _chunk_path(self, table, index):
+        table_dir = hashlib.blake2b(table.encode(), digest_size=8).hexdigest()
+        return os.path.join(self.directory, table_dir, f"{index:06d}.chunk")
+    
+    def _read_manifest(self):
+        try:
+            with open(self._manifest_path()) as manifest_file:
+                return json.load(manifest_file)
+        except (OSError, ValueError):
+            return None
+    
+    def _write_manifest(self):
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = self._manifest_path() + '.tmp'
+        with open(temp_path, 'w') as manifest_file:
+            json.dump(self.manifest, manifest_file, default=str)
+        os.replace(temp_path, self._manifest_path())
+    
+    def pending(self):
+        if not self.manifest:
+            return None
+        entries = self.manifest['tables'].values()
+        return {
+            'database': self.manifest['database'],
+            'created': self.manifest['created'],
+            'tables': len(self.manifest['table_list']),
+            'done': sum(1 for entry in entries if entry['done']),
+            'rows': sum(entry['rows'] for entry in entries)
+        }
+    
+    def start(self, database, tables, resume=True):
+        with self.lock:
+            if (not resume or not self.manifest or self.manifest['database'] != database or
+                    sorted(self.manifest['table_list']) != sorted(tables)):
+                self.buffers = {}
+                shutil.rmtree(self.directory, ignore_errors=True)
+                self.manifest = {
+                    'database': database,
+                    'table_list': list(tables),
+                    'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+                    'tables': {}
+                }
+                self._write_manifest()
+        return self
+    
+    def entry(self, table):
+        return self.manifest['tables'].get(table)
+    
+    def restore(self, table, state, row_key):
+        entry = self.manifest['tables'].get(table)
+        last_key = None
+        rows = 0
+        for index in range(entry['chunks'] if entry else 0):
+            with open(self._chunk_path(table, index), 'rb') as chunk_file:
+                codec_name, blob = chunk_file.read().split(b'\n', 1)
+            for row in pickle.loads(ChunkCodec(codec_name.decode()).decompress(blob)):
+                last_key = row_key(row)
+                state[last_key] = row
+                rows += 1
+        return last_key, rows
+    
+    def _write_chunks(self, table, meta, done=False):
+        entry = self.manifest['tables'].setdefault(table, {'chunks': 0, 'rows': 0, 'done': False, 'meta': None})
+        rows = self.buffers.pop(table, [])
+        for start in range(0, len(rows), self.chunk_rows):
+            chunk = rows[start:start + self.chunk_rows]
+            path = self._chunk_path(table, entry['chunks'])
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            payload = pickle.dumps(chunk, protocol=pickle.HIGHEST_PROTOCOL)
+            with open(path, 'wb') as chunk_file:
+                chunk_file.write(self.codec.name.encode() + b'\n' + self.codec.compress(payload))
+            entry['chunks'] += 1
+            entry['rows'] += len(chunk)
+        entry['meta'] = {name: value for name, value in meta.items() if name != 'snapshot'}
+        entry['done'] = done
+        self._write_manifest()
+    
+    def append(self, table, rows, meta):
+        with self.lock:
+            buffer = self.buffers.setdefault(table, [])
+            buffer.extend(rows)
+            if len(buffer) >= self.chunk_rows:
+                self._write_chunks(table, meta)
+    
+    def flush(self, table, meta):
+        with self.lock:
+            if self.manifest is not None and self.buffers.get(table):
+                self._write_chunks(table, meta)
+    
+    def finish_table(self, table, meta):
+        with self.lock:
+            self._write_chunks(table, meta, done=True)
+    
+    def reset_table(self, table):
+        with self.lock:
+            self.buffers.pop(table, None)
+            if self.manifest['tables'].pop(table, None) is not None:
+                shutil.rmtree(os.path.dirname(self._chunk_path(table, 0)), ignore_errors=True)
+                self._write_manifest()
+    
+    def discard(self):
+        with self.lock:
+            self.buffers = {}
+            self.manifest = None
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+class BatchSizer:
+    def __init__(self, initial_size=1000, min_size=100, max_size=50000, target_seconds=0.5, max_bytes=64 * 1024 * 1024, adaptive=True):
+        self.min_size = max(1, min_size)
+        self.max_size = max(self.min_size, max_size)
+        self.target_seconds = target_seconds
+        self.max_bytes = max_bytes
+        self.adaptive = adaptive
+        self.size = initial_size if not adaptive else min(self.max_size, max(self.min_size, initial_size))
+        self.rows_per_sec = 0.0
+        self.bytes_per_row = 0.0
+    
+    def observe(self, rows, nbytes, seconds):
+        if not self.adaptive or rows <= 0:
+            return self.size
+        self.rows_per_sec = rows / seconds if seconds > 0 else float('inf')
+        self.bytes_per_row = nbytes / rows
+        limits = [self.max_size, self.size * 2]
+        if self.rows_per_sec != float('inf'):
+            limits.append(int(self.rows_per_sec * self.target_seconds))
+        if self.bytes_per_row > 0:
+            limits.append(int(self.max_bytes / self.bytes_per_row))
+        self.size = max(self.min_size, min(limits))
+        return self.size
 
 class DatabaseModel:
+    PROFILES = {
+        'low-memory': {
+            'fetch_strategy': 'batched', 'fetch_workers': '1', 'pool_size': 'auto', 'compress': 'false',
+            'batch_size': 'auto', 'batch_max_mb': '16', 'snapshot_compression': 'auto', 'pipelined_compare': 'true',
+            'free_initial_state': 'false', 'result_mode': 'rows', 'large_columns': 'auto', 'memory_limit_mb': '512'
+        },
+        'max-throughput': {
+            'fetch_strategy': 'fast', 'fetch_workers': '4', 'pool_size': 'auto', 'compress': 'false',
+            'fetch_mode': 'raw', 'batch_size': 'auto', 'batch_max_mb': '256', 'snapshot_compression': 'none',
+            'pipelined_compare': 'true', 'result_mode': 'cells', 'memory_limit_mb': '0'
+        },
+        'remote-wan': {
+            'fetch_strategy': 'batched', 'fetch_workers': '2', 'pool_size': 'auto', 'compress': 'true',
+            'batch_size': 'auto', 'batch_max_mb': '32', 'snapshot_compression': 'auto', 'pipelined_compare': 'true',
+            'large_columns': 'auto', 'checkpoint': 'true', 'fetch_retries': '5', 'memory_limit_mb': '2048'
+        }
+    }
+    MYSQL_OPTIONS = ('pool_size', 'pool_timeout', 'fetch_workers', 'compress', 'consistent_snapshot', 'snapshot_lock')
+    
     def __init__(self, config_path=None):
         self.script_directory = os.path.dirname(os.path.abspath(__file__))
         self.config_path = config_path if config_path is not None else os.path.join(self.script_directory, 'config.ini')
         self.config = self.load_config(self.config_path)
-        self.column_cache = {}
+        self.schema_cache = SchemaCache(self.config['database'])
+        self.table_rules = self.load_table_rules(self.config_path)
+        self.recorder = PerformanceRecorder(self.config['trace_memory'])
+        self.batch_sizes = {}
+        self.pool_autosized = False
+        self.last_snapshot = {}
+        self.snapshot_store = self._create_snapshot_store()
+        self.governor = self._create_governor()
         self.connection_pool = self._create_connection_pool()
         
+    def load_profiles(self, config):
+        profiles = {name: dict(settings) for name, settings in self.PROFILES.items()}
+        for section in config.sections():
+            if section.startswith('profile:'):
+                name = section[len('profile:'):].strip().lower()
+                profiles.setdefault(name, {}).update(config[section])
+        return profiles
+    
+    def get_profiles(self):
+        config = configparser.ConfigParser()
+        config.read(self.config_path)
+        return self.load_profiles(config)
+    
     def load_config(self, config_path=None):
         config = configparser.ConfigParser()
         if config_path is None:
             config_path = os.path.join(self.script_directory, 'config.ini')
         config.read(config_path)
+        profile = config.get('performance', 'profile', fallback='').strip().lower()
+        for option, value in self.load_profiles(config).get(profile, {}).items():
+            section = 'mysql' if option in self.MYSQL_OPTIONS else 'performance'
+            if not config.has_section(section):
+                config.add_section(section)
+            config.set(section, option, str(value))
+        pool_size = config['mysql'].get('pool_size', '5').strip().lower()
         return {
             'host': config['mysql']['host'],
             'user': config['mysql']['user'],
             'password': config['mysql']['password'],
             'database': config['mysql']['database'],
             'pool_name': 'db_pool',
-            'pool_size': int(config['mysql'].get('pool_size', 5))
+            'pool_size': 'auto' if pool_size == 'auto' else int(pool_size),
+            'pool_timeout': float(config['mysql'].get('pool_timeout', 30)),
+            'fetch_workers': int(config['mysql'].get('fetch_workers', 1)),
+            'compress': config['mysql'].getboolean('compress', fallback=False),
+            'consistent_snapshot': config['mysql'].getboolean('consistent_snapshot', fallback=False),
+            'snapshot_lock': config['mysql'].get('snapshot_lock', 'auto').strip().lower(),
+            'history_dir': config.get('history', 'dir', fallback='snapshots'),
+            'history_auto_save': config.getboolean('history', 'auto_save', fallback=False),
+            'watch_interval': config.getfloat('watch', 'interval', fallback=5.0),
+            'watch_detection': config.get('watch', 'detection', fallback='auto').strip().lower(),
+            'watch_max_load': min(1.0, max(0.01, config.getfloat('watch', 'max_load', fallback=0.2))),
+            'page_size': config.getint('display', 'page_size', fallback=100),
+            'profile': profile,
+            'fetch_strategy': config.get('performance', 'fetch_strategy', fallback='batched').strip().lower(),
+            'memory_limit_mb': config.getfloat('performance', 'memory_limit_mb', fallback=0),
+            'report_dir': config.get('performance', 'report_dir', fallback='perf_reports'),
+            'fetch_mode': config.get('performance', 'fetch_mode', fallback='typed').strip().lower(),
+            'batch_size': config.get('performance', 'batch_size', fallback='auto').strip().lower(),
+            'min_batch_size': config.getint('performance', 'min_batch_size', fallback=500),
+            'max_batch_size': config.getint('performance', 'max_batch_size', fallback=50000),
+            'batch_target_seconds': config.getfloat('performance', 'batch_target_seconds', fallback=0.5),
+            'batch_max_mb': config.getfloat('performance', 'batch_max_mb', fallback=64),
+            'result_mode': config.get('performance', 'result_mode', fallback='cells').strip().lower(),
+            'large_columns': config.get('performance', 'large_columns', fallback='auto').strip().lower(),
+            'large_value_bytes': max(0, config.getint('performance', 'large_value_bytes', fallback=4096)),
+            'checkpoint': config.getboolean('performance', 'checkpoint', fallback=False),
+            'checkpoint_dir': config.get('performance', 'checkpoint_dir', fallback='checkpoints').strip(),
+            'checkpoint_rows': config.getint('performance', 'checkpoint_rows', fallback=50000),
+            'fetch_retries': max(0, config.getint('performance', 'fetch_retries', fallback=3)),
+            'retry_backoff': config.getfloat('performance', 'retry_backoff', fallback=1.0),
+            'pipelined_compare': config.getboolean('performance', 'pipelined_compare', fallback=True),
+            'free_initial_state': config.getboolean('performance', 'free_initial_state', fallback=False),
+            'snapshot_mode': config.get('performance', 'snapshot_mode', fallback='client').strip().lower(),
+            'scratch_schema': config.get('performance', 'scratch_schema', fallback='comparer_scratch').strip(),
+            'snapshot_compression': config.get('performance', 'snapshot_compression', fallback='none').strip().lower(),
+            'snapshot_chunk_rows': config.getint('performance', 'snapshot_chunk_rows', fallback=2000),
+            'snapshot_spill': config.getboolean('performance', 'snapshot_spill', fallback=False),
+            'spill_dir': config.get('performance', 'spill_dir', fallback='').strip(),
+            'trace_memory': config.getboolean('performance', 'trace_memory', fallback=False)
+        }
+    
+    def load_table_rules(self, config_path=None):
+        config = configparser.ConfigParser()
+        if config_path is None:
+            config_path = os.path.join(self.script_directory, 'config.ini')
+        config.read(config_path)
+        rules = {}
+        for section in config.sections():
+            if not section.startswith('table:'):
+                continue
+            table = section[len('table:'):].strip()
+            rules[table] = {
+                'include': self._split_list(config[section].get('include', '')),
+                'exclude': self._split_list(config[section].get('exclude', '')),
+                'where': config[section].get('where', '').strip(),
+                'sample': int(config[section].get('sample', 0) or 0),
+                'snapshot_mode': config[section].get('snapshot_mode', '').strip().lower()
+            }
+        return rules
+    
+    def _split_list(self, value):
+        return [item.strip() for item in value.split(',') if item.strip()]
+    
+    def get_table_rules(self, table):
+        defaults = self.table_rules.get('*', {})
+        rules = self.table_rules.get(table, {})
+        return {
+            'include': rules.get('include') or defaults.get('include') or [],
+            'exclude': list(defaults.get('exclude', [])) + [c for c in rules.get('exclude', []) if c not in defaults.get('exclude', [])],
+            'where': rules.get('where') or defaults.get('where') or '',
+            'sample': rules.get('sample') or defaults.get('sample') or 0,
+            'snapshot_mode': rules.get('snapshot_mode') or defaults.get('snapshot_mode') or ''
+        }
+    
+    def save_table_rules(self, table, include=None, exclude=None, where=None, sample=None):
+        config = configparser.ConfigParser()
+        config.read(self.config_path)
+        section = f"table:{table}"
+        if not config.has_section(section):
+            config.add_section(section)
+        if include is not None:
+            config[section]['include'] = ', '.join(include)
+        if exclude is not None:
+            config[section]['exclude'] = ', '.join(exclude)
+        if where is not None:
+            config[section]['where'] = where.strip()
+        if sample is not None:
+            config[section]['sample'] = str(sample) if sample > 1 else ''
+        if not any(config[section].values()):
+            config.remove_section(section)
+        with open(self.config_path, 'w') as configfile:
+            config.write(configfile)
+        self.table_rules = self.load_table_rules(self.config_path)
+    
+    def refresh_schema_cache(self, force=False):
+        if self.schema_cache.loaded and not force:
+            return []
+        with self.get_connection() as conn:
+            return self.schema_cache.refresh(conn)
+    
+    def get_table_key(self, table):
+        self.refresh_schema_cache()
+        return self.schema_cache.key(table)
+    
+    def get_projected_columns(self, table, rules=None, key=None):
+        columns = self.get_table_columns(table)
+        if rules is None:
+            rules = self.get_table_rules(table)
+        if key is None:
+            key = self.get_table_key(table)
+        include = set(rules.get('include') or columns)
+        exclude = set(rules.get('exclude') or [])
+        return [col for col in columns if col in key or (col in include and col not in exclude)]
+    
+    def large_column_types(self):
+        setting = self.config['large_columns']
+        if setting == 'none':
+            return ()
+        if setting == 'auto':
+            return ('text', 'mediumtext', 'longtext', 'blob', 'mediumblob', 'longblob', 'json')
+        return tuple(self._split_list(setting))
+    
+    def get_digest_columns(self, table, columns, key):
+        large_types = self.large_column_types()
+        column_types = dict(self.schema_cache.schema(table))
+        return [
+            col for col in columns
+            if col not in key and column_types.get(col, '').split('(')[0] in large_types
+        ]
+    
+    def build_table_meta(self, table):
+        rules = self.get_table_rules(table)
+        key = self.get_table_key(table)
+        columns = self.get_projected_columns(table, rules, key)
+        snapshot_mode = 'server' if key and (rules['snapshot_mode'] or self.config['snapshot_mode']) == 'server' else 'client'
+        return {
+            'columns': columns,
+            'key': key,
+            'where': rules['where'],
+            'sample': rules['sample'] if rules['sample'] > 1 else 0,
+            'schema': self.schema_cache.schema(table),
+            'fetch_mode': self.config['fetch_mode'],
+            'snapshot_mode': snapshot_mode,
+            'digest_columns': self.get_digest_columns(table, columns, key) if snapshot_mode == 'client' else [],
+            'digest_threshold': self.config['large_value_bytes']
         }
     
+    def reconcile_table_meta(self, table, meta):
+        current = self.build_table_meta(table)
+        if meta.get('schema') == current['schema']:
+            return dict(meta)
+        existing = set(self.get_table_columns(table))
+        previous = set(name for name, _ in meta.get('schema') or [])
+        key = meta.get('key') if all(col in existing for col in meta.get('key') or []) else current['key']
+        columns = [col for col in meta['columns'] if col in existing]
+        columns += [col for col in current['columns'] if col not in previous and col not in columns]
+        columns += [col for col in key if col not in columns]
+        order = {col: idx for idx, col in enumerate(self.get_table_columns(table))}
+        digest_columns = [col for col in meta.get('digest_columns') or [] if col in columns and col not in key]
+        digest_columns += [col for col in current.get('digest_columns') or [] if col not in previous and col in columns]
+        reconciled = dict(meta)
+        reconciled.update({
+            'columns': sorted(columns, key=order.get),
+            'key': key,
+            'schema': current['schema'],
+            'digest_columns': digest_columns
+        })
+        return reconciled
+    
+    def _where_conditions(self, meta):
+        conditions = []
+        if meta.get('where'):
+            conditions.append(f"({meta['where']})")
+        if meta.get('sample'):
+            sample_columns = meta.get('key') or meta['columns']
+            conditions.append(
+                f"MOD(CRC32(CONCAT_WS(CHAR(31), {self._select_list(sample_columns)})), {int(meta['sample'])}) = 0"
+            )
+        return conditions
+    
+    def _where_clause(self, meta, extra=None):
+        conditions = self._where_conditions(meta) + (extra or [])
+        return f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    
+    def _seek_condition(self, key_columns, last_key):
+        if len(key_columns) == 1:
+            return f"{self._quote_identifier(key_columns[0])} > %s", [last_key]
+        placeholders = ", ".join(["%s"] * len(key_columns))
+        return f"({self._select_list(key_columns)}) > ({placeholders})", list(last_key)
+    
+    def _is_binary_column(self, meta, column):
+        column_types = dict(meta.get('schema') or [])
+        return column_types.get(column, '').startswith(
+            ('binary', 'varbinary', 'tinyblob', 'blob', 'mediumblob', 'longblob', 'bit')
+        )
+    
+    def _raw_key_decoder(self, meta, column):
+        if self._is_binary_column(meta, column):
+            return lambda value: bytes(value) if value is not None else None
+        return lambda value: value.decode('utf-8') if value is not None else None
+    
+    def make_row_keyer(self, meta):
+        columns = meta['columns']
+        key_columns = meta.get('key') or []
+        if key_columns and meta.get('fetch_mode') == 'raw':
+            decoders = [(columns.index(col), self._raw_key_decoder(meta, col)) for col in key_columns]
+            if len(decoders) == 1:
+                index, decode = decoders[0]
+                return lambda row: decode(row[index])
+            return lambda row: tuple(decode(row[i]) for i, decode in decoders)
+        if len(key_columns) == 1:
+            index = columns.index(key_columns[0])
+            return lambda row: row[index]
+        if key_columns:
+            indexes = [columns.index(col) for col in key_columns]
+            return lambda row: tuple(row[i] for i in indexes)
+        occurrences = {}
+        def row_hash_key(row):
+            digest = hashlib.blake2b(repr(row).encode('utf-8'), digest_size=8).digest()
+            count = occurrences.get(digest, 0)
+            occurrences[digest] = count + 1
+            return (digest, count)
+        return row_hash_key
+    
+    def _quote_identifier(self, name):
+        return "`" + str(name).replace("`", "``") + "`"
+    
+    def _select_list(self, columns):
+        return ", ".join(self._quote_identifier(col) for col in columns)
+    
+    def _fetch_select_list(self, meta):
+        digest_columns = set(meta.get('digest_columns') or [])
+        threshold = int(meta.get('digest_threshold') or 0)
+        select = []
+        for col in meta['columns']:
+            quoted = self._quote_identifier(col)
+            if col in digest_columns:
+                select.append(
+                    f"CASE WHEN OCTET_LENGTH({quoted}) > {threshold} "
+                    f"THEN CONCAT('[', OCTET_LENGTH({quoted}), ' bytes, md5 ', MD5({quoted}), ']') ELSE {quoted} END AS {quoted}"
+                )
+            else:
+                select.append(quoted)
+        return ", ".join(select)
+    
+    def fetch_full_value(self, table, meta, key, column):
+        key_columns = meta.get('key') or []
+        if not key_columns:
+            return None
+        values = list(key) if len(key_columns) > 1 else [key]
+        condition = " AND ".join(f"{self._quote_identifier(col)} = %s" for col in key_columns)
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f"SELECT {self._quote_identifier(column)} FROM {table} WHERE {condition}", values)
+                row = cursor.fetchone()
+            finally:
+                cursor.close()
+        return row[0] if row else None
+    
     def reload_config(self):
+        previous = (self.config['host'], self.config['database'])
         self.config = self.load_config(self.config_path)
-        self.column_cache = {}
+        self.recorder.trace_memory = self.config['trace_memory']
+        if (self.config['host'], self.config['database']) != previous:
+            self.schema_cache = SchemaCache(self.config['database'])
+        self.table_rules = self.load_table_rules(self.config_path)
+        if self.connection_pool:
+            self.connection_pool.close_all()
+        self.pool_autosized = False
+        self.snapshot_store = self._create_snapshot_store()
+        self.governor = self._create_governor()
         self.connection_pool = self._create_connection_pool()
         return self.config
     
+    def _connect_args(self):
+        args = {
+            'host': self.config['host'],
+            'user': self.config['user'],
+            'password': self.config['password'],
+            'database': self.config['database']
+        }
+        if self.config['fetch_mode'] == 'raw':
+            args['use_pure'] = False
+        if self.config['compress']:
+            args['compress'] = True
+        return args
+    
+    def _create_snapshot_store(self):
+        directory = self.config['history_dir']
+        if not os.path.isabs(directory):
+            directory = os.path.join(self.script_directory, directory)
+        codec = self.config['snapshot_compression']
+        return SnapshotStore(directory, 'auto' if codec == 'none' else codec, self.config['snapshot_chunk_rows'])
+    
+    def _create_governor(self):
+        return MemoryGovernor(int(self.config['memory_limit_mb'] * 1024 * 1024), self.config['spill_dir'])
+    
+    def open_checkpoint(self, stage):
+        directory = self.config['checkpoint_dir']
+        if not os.path.isabs(directory):
+            directory = os.path.join(self.script_directory, directory)
+        codec = self.config['snapshot_compression']
+        return FetchCheckpoint(os.path.join(directory, stage), 'auto' if codec == 'none' else codec, self.config['checkpoint_rows'])
+    
     def _create_connection_pool(self):
-        try:
-            pool_config = {
-                'pool_name': self.config['pool_name'],
-                'pool_size': self.config['pool_size'],
-                'host': self.config['host'],
-                'user': self.config['user'],
-                'password': self.config['password'],
-                'database': self.config['database']
-            }
-            return mysql.connector.pooling.MySQLConnectionPool(**pool_config)
-        except Exception as e:
-            print(f"Error creating connection pool: {e}")
-            return None
+        pool_size = self.config['pool_size']
+        if pool_size == 'auto':
+            pool_size = self.config['fetch_workers'] + 1
+        return ConnectionPool(self._connect_args(), pool_size=pool_size, timeout=self.config['pool_timeout'])
     
-    def get_connection(self):
-        if self.connection_pool:
+    def get_connection(self, timeout=None):
+        return self.connection_pool.get_connection(timeout)
+    
+    def get_pool_stats(self):
+        return self.connection_pool.stats()
+    
+    def recommend_pool_size(self, concurrency):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
             try:
-                return self.connection_pool.get_connection()
-            except:
-                pass
-        return mysql.connector.connect(
-            host=self.config['host'],
-            user=self.config['user'],
-            password=self.config['password'],
-            database=self.config['database']
-        )
+                cursor.execute("SHOW VARIABLES LIKE 'max_connections'")
+                max_connections = int(cursor.fetchone()[1])
+                cursor.execute("SHOW STATUS LIKE 'Threads_connected'")
+                threads_connected = int(cursor.fetchone()[1])
+            finally:
+                cursor.close()
+        headroom = max(1, (max_connections - threads_connected) // 2)
+        return max(1, min(concurrency + 1, headroom))
+    
+    def autosize_pool(self, concurrency=None):
+        if self.config['pool_size'] != 'auto' or self.pool_autosized:
+            return self.connection_pool.pool_size
+        if concurrency is None:
+            concurrency = self.config['fetch_workers']
+        self.connection_pool.resize(self.recommend_pool_size(concurrency))
+        self.pool_autosized = True
+        return self.connection_pool.pool_size
     
     def get_tables(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SHOW TABLES")
-        tables = [t[0] for t in cursor.fetchall()]
-        cursor.close()
-        conn.close()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SHOW TABLES")
+                tables = [t[0] for t in cursor.fetchall()]
+            finally:
+                cursor.close()
         return tables
     
     def get_table_columns(self, table):
-        if table in self.column_cache:
-            return self.column_cache[table]
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute(f"SHOW COLUMNS FROM {table}")
-        columns = [col[0] for col in cursor.fetchall()]
-        cursor.close()
-        conn.close()
-        self.column_cache[table] = columns
-        return columns
-    
-    def fetch_table_state_fast(self, table, callback=None, stop_event=None):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT COUNT(*) FROM {table}")
-        total_rows = cursor.fetchone()[0]
-        columns = self.get_table_columns(table)
-        cursor.execute(f"SELECT * FROM {table}")
-        all_rows = cursor.fetchall()
-        state = {}
-        for row in all_rows:
-            if stop_event and stop_event.is_set():
+        self.refresh_schema_cache()
+        return self.schema_cache.column_names(table)
+    
+    def new_table_state(self):
+        codec = self.config['snapshot_compression']
+        if codec == 'none':
+            if not self.governor.limit_bytes:
+                return {}
+            codec = 'auto'
+        return CompressedTableState(
+            ChunkCodec(codec),
+            chunk_rows=self.config['snapshot_chunk_rows'],
+            spill_dir=self.config['spill_dir'] if self.config['snapshot_spill'] else None
+        )
+    
+    def _finish_table_state(self, table, state, meta):
+        if isinstance(state, CompressedTableState):
+            state.finish()
+            meta['snapshot'] = state.stats()
+            self.governor.register(state, meta)
+            self.governor.check()
+        return state
+    
+    def _session_bytes_sent(self, cursor):
+        try:
+            cursor.execute("SHOW SESSION STATUS LIKE 'Bytes_sent'")
+            return int(cursor.fetchone()[1])
+        except Exception:
+            return None
+    
+    def _record_wire_bytes(self, table, cursor, started):
+        if started is None:
+            return
+        finished = self._session_bytes_sent(cursor)
+        if finished is not None:
+            self.recorder.end(self.recorder.begin(table, 'select'), wire_bytes=finished - started)
+    
+    def table_fingerprints(self, tables, detection=None):
+        detection = detection or self.config['watch_detection']
+        fingerprints = {table: None for table in tables}
+        if detection == 'none' or not tables:
+            return fingerprints
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                unresolved = list(tables)
+                if detection in ('auto', 'metadata'):
+                    try:
+                        cursor.execute("SET SESSION information_schema_stats_expiry = 0")
+                    except Exception:
+                        pass
+                    cursor.execute("SELECT NOW()")
+                    now = cursor.fetchone()[0]
+                    cursor.execute(
+                        "SELECT TABLE_NAME, UPDATE_TIME, TABLE_ROWS, AUTO_INCREMENT, DATA_LENGTH FROM information_schema.TABLES "
+                        f"WHERE TABLE_SCHEMA = %s AND TABLE_NAME IN ({', '.join(['%s'] * len(tables))})",
+                        (self.config['database'], *tables)
+                    )
+                    for name, update_time, table_rows, auto_increment, data_length in cursor.fetchall():
+                        if update_time is None or name not in fingerprints:
+                            continue
+                        if str(update_time) >= str(now):
+                            fingerprints[name] = ('unsettled', str(now))
+                        else:
+                            fingerprints[name] = ('metadata', str(update_time), table_rows, auto_increment, data_length)
+                        unresolved.remove(name)
+                if unresolved and detection in ('auto', 'checksum'):
+                    cursor.execute(f"CHECKSUM TABLE {', '.join(self._quote_identifier(table) for table in unresolved)}")
+                    for name, checksum in cursor.fetchall():
+                        name = name.split('.', 1)[-1]
+                        if name in fingerprints and checksum is not None:
+                            fingerprints[name] = ('checksum', checksum)
+            finally:
                 cursor.close()
-                conn.close()
-                return None, None
-            key = row[0]
-            state[key] = row
+        return fingerprints
+
+    def _estimate_rows_bytes(self, rows):
+        if not rows:
+            return 0
+        row_bytes = sum(len(value) if isinstance(value, (str, bytes, bytearray)) else 8 for value in rows[0])
+        return row_bytes * len(rows)
+    
+    def _fetch_with_retry(self, conn, cursor, retry, raw, query, params=None, stop_event=None):
+        attempt = 0
+        while True:
+            try:
+                if cursor is None:
+                    conn.reconnect()
+                    cursor = conn.cursor(raw=raw)
+                if params is None:
+                    cursor.execute(query)
+                else:
+                    cursor.execute(query, params)
+                return cursor, cursor.fetchall()
+            except (mysql.connector.errors.OperationalError, mysql.connector.errors.InterfaceError):
+                attempt += 1
+                if not retry or attempt > self.config['fetch_retries'] or (stop_event and stop_event.is_set()):
+                    raise
+                if cursor is not None:
+                    try:
+                        cursor.close()
+                    except Exception:
+                        pass
+                    cursor = None
+                delay = self.config['retry_backoff'] * 2 ** (attempt - 1)
+                if stop_event:
+                    stop_event.wait(delay)
+                else:
+                    time.sleep(delay)
+    
+    def load_checkpointed_table(self, table, meta, checkpoint, callback=None):
+        state = self.new_table_state()
+        with self.recorder.phase(table, 'restore') as counters:
+            _, rows = checkpoint.restore(table, state, self.make_row_keyer(meta))
+            self._finish_table_state(table, state, meta)
+            counters['rows'] = rows
+        meta['row_count'] = rows
+        if callback:
+            callback(table, rows, rows, 0)
+        return state, meta['columns']
+    
+    def fetch_table_state_fast(self, table, callback=None, stop_event=None, meta=None, conn=None, checkpoint=None):
+        if conn is not None:
+            return self._fetch_table_state_fast(table, conn, False, callback, stop_event, meta, checkpoint)
+        with self.get_connection() as conn:
+            return self._fetch_table_state_fast(table, conn, True, callback, stop_event, meta, checkpoint)
+    
+    def _fetch_table_state_fast(self, table, conn, retry, callback, stop_event, meta, checkpoint):
+        if meta is None:
+            meta = self.build_table_meta(table)
+        columns = meta['columns']
+        where = self._where_clause(meta)
+        raw = meta.get('fetch_mode') == 'raw'
+        cursor = conn.cursor(raw=raw)
+        try:
+            if checkpoint:
+                checkpoint.reset_table(table)
+            wire_started = self._session_bytes_sent(cursor)
+            with self.recorder.phase(table, 'select') as counters:
+                cursor, all_rows = self._fetch_with_retry(
+                    conn, cursor, retry, raw, f"SELECT {self._fetch_select_list(meta)} FROM {table}{where}", stop_event=stop_event
+                )
+                counters.update(rows=len(all_rows), bytes=self._estimate_rows_bytes(all_rows), queries=1)
+            self._record_wire_bytes(table, cursor, wire_started)
+        finally:
+            cursor.close()
+        row_key = self.make_row_keyer(meta)
+        state = self.new_table_state()
+        with self.recorder.phase(table, 'convert') as counters:
+            for row in all_rows:
+                if stop_event and stop_event.is_set():
+                    return None, None
+                state[row_key(row)] = row
+            self._finish_table_state(table, state, meta)
+            counters['rows'] = len(state)
+        meta['row_count'] = len(all_rows)
+        if checkpoint:
+            checkpoint.append(table, all_rows, meta)
+            checkpoint.finish_table(table, meta)
         if callback:
-            callback(table, total_rows, total_rows)
-        cursor.close()
-        conn.close()
+            callback(table, len(all_rows), len(all_rows), self._estimate_rows_bytes(all_rows))
         return state, columns
     
-    def fetch_table_state(self, table, batch_size=1000, callback=None, stop_event=None):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT COUNT(*) FROM {table}")
-        total_rows = cursor.fetchone()[0]
-        columns = self.get_table_columns(table)
-        state = {}
-        offset = 0
-        processed = 0
-        while True:
-            if stop_event and stop_event.is_set():
+    def _shadow_table(self, table):
+        name = f"{self.config['database']}__{table}"
+        if len(name) > 64:
+            name = name[:47] + '_' + hashlib.blake2b(name.encode(), digest_size=8).hexdigest()
+        return f"{self._quote_identifier(self.config['scratch_schema'])}.{self._quote_identifier(name)}"
+    
+    def fetch_table_shadow(self, table, callback=None, meta=None):
+        if meta is None:
+            meta = self.build_table_meta(table)
+        shadow = self._shadow_table(table)
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                with self.recorder.phase(table, 'shadow') as counters:
+                    cursor.execute(f"CREATE DATABASE IF NOT EXISTS {self._quote_identifier(self.config['scratch_schema'])}")
+                    cursor.execute(f"DROP TABLE IF EXISTS {shadow}")
+                    cursor.execute(f"CREATE TABLE {shadow} LIKE {table}")
+                    cursor.execute(f"INSERT INTO {shadow} SELECT * FROM {table}{self._where_clause(meta)}")
+                    rows = max(cursor.rowcount, 0)
+                    conn.commit()
+                    counters.update(rows=rows, queries=4)
+            finally:
                 cursor.close()
-                conn.close()
-                return None, None
-            cursor.execute(f"SELECT * FROM {table} LIMIT {batch_size} OFFSET {offset}")
-            batch = cursor.fetchall()
-            if not batch:
-                break
-            for row in batch:
-                key = row[0]
-                state[key] = row
-            processed += len(batch)
-            offset += batch_size
-            if callback:
-                callback(table, processed, total_rows)
-            if len(batch) < batch_size:
-                break
-        cursor.close()
-        conn.close()
+        meta['shadow'] = shadow
+        if callback:
+            callback(table, rows, rows, 0)
+        return ServerSideState(table, shadow, rows), meta['columns']
+    
+    def drop_shadow_tables(self, metas):
+        shadows = [meta['shadow'] for meta in metas.values() if meta.get('shadow')]
+        if not shadows:
+            return
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                for shadow in shadows:
+                    cursor.execute(f"DROP TABLE IF EXISTS {shadow}")
+            finally:
+                cursor.close()
+    
+    def server_side_differences(self, table, initial_meta, current_meta, batch_size=5000):
+        shadow = initial_meta['shadow']
+        key_columns = initial_meta['key']
+        initial_columns = initial_meta['columns']
+        current_columns = current_meta['columns']
+        compared = [col for col in initial_columns if col in current_columns and col not in key_columns]
+        live = f"(SELECT {self._select_list(current_columns)} FROM {table}{self._where_clause(current_meta)}) AS t"
+        join = " AND ".join(f"s.{col} <=> t.{col}" for col in map(self._quote_identifier, key_columns))
+        qualified = lambda alias, columns: ", ".join(f"{alias}.{self._quote_identifier(col)}" for col in columns)
+        queries = [
+            ('deleted', f"SELECT {qualified('s', initial_columns)} FROM {shadow} AS s "
+                        f"WHERE NOT EXISTS (SELECT 1 FROM {live} WHERE {join})"),
+            ('added', f"SELECT {qualified('t', current_columns)} FROM {live} "
+                      f"WHERE NOT EXISTS (SELECT 1 FROM {shadow} AS s WHERE {join})")
+        ]
+        if compared:
+            unchanged = " AND ".join(f"s.{col} <=> t.{col}" for col in map(self._quote_identifier, compared))
+            queries.append(('modified', f"SELECT {qualified('s', initial_columns)}, {qualified('t', current_columns)} "
+                                        f"FROM {shadow} AS s JOIN {live} ON {join} WHERE NOT ({unchanged})"))
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            unread = False
+            try:
+                for change_type, query in queries:
+                    token = self.recorder.begin(table, 'server_diff')
+                    cursor.execute(query)
+                    unread = True
+                    rows = 0
+                    while True:
+                        batch = cursor.fetchmany(batch_size)
+                        if not batch:
+                            break
+                        rows += len(batch)
+                        for row in batch:
+                            if change_type == 'modified':
+                                yield change_type, row[:len(initial_columns)], row[len(initial_columns):]
+                            elif change_type == 'deleted':
+                                yield change_type, row, None
+                            else:
+                                yield change_type, None, row
+                    unread = False
+                    self.recorder.end(token, rows, queries=1)
+            finally:
+                if unread:
+                    conn.discard()
+                else:
+                    cursor.close()
+
+    def estimate_table_rows(self, table, meta, cursor=None):
+        estimate = self.schema_cache.table_info(table).get('table_rows')
+        key_columns = meta.get('key') or []
+        if not estimate and cursor is not None and len(key_columns) == 1:
+            column_type = dict(meta.get('schema') or []).get(key_columns[0], '')
+            if column_type.startswith(('tinyint', 'smallint', 'mediumint', 'int', 'bigint')):
+                key = self._quote_identifier(key_columns[0])
+                with self.recorder.phase(table, 'estimate') as counters:
+                    cursor.execute(f"SELECT MIN({key}), MAX({key}) FROM {table}")
+                    low, high = cursor.fetchone()
+                    counters['queries'] += 1
+                if low is not None and high is not None:
+                    estimate = int(high) - int(low) + 1
+        estimate = int(estimate or 0)
+        if meta.get('sample'):
+            estimate //= meta['sample']
+        return estimate
+    
+    def make_batch_sizer(self, table, batch_size=None, meta=None):
+        configured = self.config['batch_size']
+        if batch_size is None and configured != 'auto':
+            batch_size = int(configured)
+        if batch_size is not None:
+            return BatchSizer(batch_size, adaptive=False)
+        initial_size = (meta or {}).get('batch_size') or self.batch_sizes.get(table) or self.config['min_batch_size'] * 2
+        return BatchSizer(
+            initial_size,
+            min_size=self.config['min_batch_size'],
+            max_size=self.config['max_batch_size'],
+            target_seconds=self.config['batch_target_seconds'],
+            max_bytes=int(self.config['batch_max_mb'] * 1024 * 1024)
+        )
+    
+    def fetch_table_state(self, table, batch_size=None, callback=None, stop_event=None, meta=None, conn=None, checkpoint=None):
+        if conn is not None:
+            return self._fetch_table_state(table, conn, False, batch_size, callback, stop_event, meta, checkpoint)
+        with self.get_connection() as conn:
+            return self._fetch_table_state(table, conn, True, batch_size, callback, stop_event, meta, checkpoint)
+    
+    def _fetch_table_state(self, table, conn, retry, batch_size, callback, stop_event, meta, checkpoint):
+        if meta is None:
+            meta = self.build_table_meta(table)
+        columns = meta['columns']
+        where = self._where_clause(meta)
+        raw = meta.get('fetch_mode') == 'raw'
+        cursor = conn.cursor(raw=raw)
+        try:
+            total_rows = self.estimate_table_rows(table, meta, cursor)
+            select_list = self._fetch_select_list(meta)
+            key_columns = meta.get('key') or []
+            order_by = f" ORDER BY {self._select_list(key_columns)}" if key_columns else ""
+            row_key = self.make_row_keyer(meta)
+            sizer = self.make_batch_sizer(table, batch_size, meta)
+            state = self.new_table_state()
+            wire_started = self._session_bytes_sent(cursor)
+            offset = 0
+            processed = 0
+            nbytes = 0
+            last_key = None
+            if checkpoint and checkpoint.entry(table):
+                with self.recorder.phase(table, 'restore') as counters:
+                    last_key, processed = checkpoint.restore(table, state, row_key)
+                    counters['rows'] = processed
+                offset = processed
+            while True:
+                if stop_event and stop_event.is_set():
+                    return None, None
+                batch_size = sizer.size
+                batch_started = time.perf_counter()
+                token = self.recorder.begin(table, 'select')
+                if key_columns:
+                    params = []
+                    extra = []
+                    if last_key is not None:
+                        condition, params = self._seek_condition(key_columns, last_key)
+                        extra.append(condition)
+                    query = f"SELECT {select_list} FROM {table}{self._where_clause(meta, extra)}{order_by} LIMIT {batch_size}"
+                else:
+                    params = None
+                    query = f"SELECT {select_list} FROM {table}{where} LIMIT {batch_size} OFFSET {offset}"
+                previous_cursor = cursor
+                cursor, batch = self._fetch_with_retry(conn, cursor, retry, raw, query, params, stop_event)
+                if cursor is not previous_cursor:
+                    wire_started = self._session_bytes_sent(cursor)
+                batch_bytes = self._estimate_rows_bytes(batch)
+                self.recorder.end(token, len(batch), batch_bytes, 1)
+                sizer.observe(len(batch), batch_bytes, time.perf_counter() - batch_started)
+                if not batch:
+                    break
+                token = self.recorder.begin(table, 'convert')
+                for row in batch:
+                    last_key = row_key(row)
+                    state[last_key] = row
+                self.recorder.end(token, len(batch))
+                self.governor.check(state)
+                if checkpoint:
+                    checkpoint.append(table, batch, meta)
+                processed += len(batch)
+                nbytes += batch_bytes
+                offset += len(batch)
+                if callback:
+                    callback(table, processed, max(total_rows, processed), nbytes)
+                if len(batch) < batch_size:
+                    break
+            self._record_wire_bytes(table, cursor, wire_started)
+        finally:
+            cursor.close()
+        self._finish_table_state(table, state, meta)
+        meta['row_count'] = processed
+        if callback:
+            callback(table, processed, processed, nbytes)
+        if sizer.adaptive:
+            meta['batch_size'] = sizer.size
+            self.batch_sizes[table] = sizer.size
+        if checkpoint:
+            checkpoint.finish_table(table, meta)
         return state, columns
     
-    def fetch_specific_tables_state(self, tables, batch_size=1000, progress_callback=None, fast_mode=False, stop_event=None):
-        all_states = {}
-        all_columns = {}
-        for i, table in enumerate(tables):
+    def _lock_for_snapshot(self, cursor, lock):
+        statements = {
+            'flush': ("FLUSH TABLES WITH READ LOCK", "UNLOCK TABLES"),
+            'backup': ("LOCK INSTANCE FOR BACKUP", "UNLOCK INSTANCE")
+        }
+        candidates = ['flush'] if lock == 'auto' else [lock]
+        for candidate in candidates:
+            if candidate not in statements:
+                continue
+            try:
+                cursor.execute(statements[candidate][0])
+                return candidate, statements[candidate][1]
+            except mysql.connector.errors.Error:
+                if lock != 'auto':
+                    raise
+        return 'none', None
+    
+    def open_snapshot_sessions(self, count):
+        sessions = []
+        try:
+            for _ in range(count):
+                sessions.append(self.get_connection())
+            lock = self.config['snapshot_lock'] if count > 1 else 'none'
+            locker = sessions[0].cursor()
+            lock_used, unlock = self._lock_for_snapshot(locker, lock)
+            warning = None
+            if lock == 'auto' and lock_used == 'none':
+                for conn in sessions[1:]:
+                    conn.close()
+                sessions = sessions[:1]
+                warning = (f"FLUSH TABLES WITH READ LOCK was denied, so the consistent snapshot was fetched "
+                           f"with 1 worker instead of {count}.")
+            try:
+                for conn in sessions:
+                    cursor = conn.cursor()
+                    cursor.execute("SET SESSION TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+                    cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT, READ ONLY")
+                    cursor.close()
+            finally:
+                if unlock:
+                    locker.execute(unlock)
+                locker.close()
+        except Exception:
+            self.close_snapshot_sessions(sessions)
+            raise
+        self.last_snapshot = {'consistent': True, 'lock': lock_used, 'workers': len(sessions), 'warning': warning}
+        return sessions
+    
+    def close_snapshot_sessions(self, sessions):
+        for conn in sessions:
+            if conn is not None:
+                conn.close()
+    
+    def fetch_specific_tables_state(self, tables, batch_size=None, progress_callback=None, fast_mode=False, stop_event=None, meta=None, on_table=None, checkpoint=None):
+        self.autosize_pool()
+        self.refresh_schema_cache(force=True)
+        if meta is None:
+            meta = {}
+        for table in tables:
             if stop_event and stop_event.is_set():
                 return None, None
+            saved = checkpoint.entry(table) if checkpoint else None
+            if saved and saved['meta']:
+                meta[table] = self.reconcile_table_meta(table, saved['meta'])
+                if (meta[table]['columns'] != saved['meta']['columns'] or
+                        meta[table].get('digest_columns') != saved['meta'].get('digest_columns') or
+                        meta[table].get('digest_threshold') != saved['meta'].get('digest_threshold')):
+                    checkpoint.reset_table(table)
+                    meta[table] = self.build_table_meta(table)
+            elif table not in meta:
+                meta[table] = self.build_table_meta(table)
+            else:
+                meta[table] = self.reconcile_table_meta(table, meta[table])
+        workers = max(1, min(self.config['fetch_workers'], len(tables)))
+        if self.config['consistent_snapshot']:
+            if any(meta[table].get('snapshot_mode') == 'server' and not meta[table].get('shadow') for table in tables):
+                if self.connection_pool.pool_size < 2 * workers:
+                    self.connection_pool.resize(2 * workers)
+            sessions = self.open_snapshot_sessions(workers)
+            workers = len(sessions)
+        else:
+            sessions = [None] * workers
+            self.last_snapshot = {'consistent': False, 'lock': 'none', 'workers': workers, 'warning': None}
+        all_states = {}
+        all_columns = {}
+        pending = deque(tables)
+        lock = threading.Lock()
+        halted = threading.Event()
+        fractions = {}
+        
+        def report(table, fraction, **details):
+            with lock:
+                fractions[table] = min(1.0, fraction)
+                progress_callback(f"Fetching {table}...", sum(fractions.values()), len(tables), table=table, **details)
+        
+        def fetch_one(table, conn):
+            callback = lambda t, p, total, nbytes=None: report(
+                t, p / total if total > 0 else 0.0, rows=p, total_rows=total, nbytes=nbytes
+            ) if progress_callback else None
             if progress_callback:
-                progress_callback(f"Fetching {table}...", i, len(tables))
+                report(table, 0.0)
+            if meta[table].get('snapshot_mode') == 'server':
+                if meta[table].get('shadow'):
+                    return ServerSideState(table), meta[table]['columns']
+                return self.fetch_table_shadow(table, callback=callback, meta=meta[table])
+            if checkpoint and (checkpoint.entry(table) or {}).get('done'):
+                return self.load_checkpointed_table(table, meta[table], checkpoint, callback)
             if fast_mode:
-                state, columns = self.fetch_table_state_fast(
-                    table, 
-                    callback=lambda t, p, total: progress_callback(
-                        f"Fetching {t}...", i, len(tables), p / (total if total > 0 else 1)
-                    ) if progress_callback else None,
-                    stop_event=stop_event
+                return self.fetch_table_state_fast(
+                    table, callback=callback, stop_event=stop_event, meta=meta[table], conn=conn, checkpoint=checkpoint
                 )
+            return self.fetch_table_state(
+                table, batch_size=batch_size, callback=callback, stop_event=stop_event, meta=meta[table], conn=conn,
+                checkpoint=checkpoint
+            )
+        
+        def worker(conn):
+            while not halted.is_set():
+                with lock:
+                    if not pending:
+                        return
+                    table = pending.popleft()
+                try:
+                    state, columns = fetch_one(table, conn)
+                except Exception:
+                    halted.set()
+                    if checkpoint:
+                        checkpoint.flush(table, meta[table])
+                    raise
+                if state is None and columns is None:
+                    halted.set()
+                    if checkpoint:
+                        checkpoint.flush(table, meta[table])
+                    return
+                if progress_callback:
+                    report(table, 1.0)
+                if on_table:
+                    on_table(table, state, columns)
+                    continue
+                with lock:
+                    all_states[table] = state
+                    all_columns[table] = columns
+        
+        try:
+            if workers == 1:
+                worker(sessions[0])
             else:
-                state, columns = self.fetch_table_state(
-                    table, 
-                    batch_size=batch_size,
-                    callback=lambda t, p, total: progress_callback(
-                        f"Fetching {t}...", i, len(tables), p / (total if total > 0 else 1)
-                    ) if progress_callback else None,
-                    stop_event=stop_event
-                )
-            if state is None and columns is None:
-                return None, None
-            all_states[table] = state
-            all_columns[table] = columns
-        return all_states, all_columns
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    futures = [executor.submit(worker, conn) for conn in sessions]
+                for future in futures:
+                    future.result()
+        finally:
+            self.close_snapshot_sessions(sessions)
+        if halted.is_set() or (stop_event and stop_event.is_set()):
+            return None, None
+        if on_table:
+            return {}, {}
+        return ({table: all_states[table] for table in tables},
+                {table: all_columns[table] for table in tables})
 
 class DatabaseController:
+    DIGEST_PATTERN = re.compile(r'^\[\d+ bytes, md5 [0-9a-f]{32}\]$')
+    
     def __init__(self, model):
         self.model = model
         self.initial_state = {}
         self.initial_columns = {}
+        self.initial_meta = {}
         self.current_state = {}
         self.current_columns = {}
+        self.current_meta = {}
+        self.current_from_history = False
         self.selected_tables = None
-        self.fast_mode = False
+        self.fast_mode = model.config['fetch_strategy'] == 'fast'
+        self.difference_counts = {}
+        self.result_mode = model.config['result_mode']
         self.stop_event = threading.Event()
         
-    def fetch_initial_state(self, batch_size=1000, progress_callback=None):
+    def pending_checkpoint(self):
+        if not self.model.config['checkpoint']:
+            return None
+        return self.model.open_checkpoint('initial').pending()
+    
+    def fetch_initial_state(self, batch_size=None, progress_callback=None, resume=True):
         self.stop_event.clear()
+        self.model.recorder.reset('initial')
         tables = self.selected_tables or self.model.get_tables()
-        self.initial_state, self.initial_columns = self.model.fetch_specific_tables_state(
-            tables, batch_size, progress_callback, fast_mode=self.fast_mode, stop_event=self.stop_event
-        )
+        self.model.drop_shadow_tables(self.initial_meta)
+        self.initial_meta = {}
+        checkpoint = None
+        if self.model.config['checkpoint']:
+            checkpoint = self.model.open_checkpoint('initial').start(self.model.config['database'], tables, resume)
+        fetched = None, None
+        try:
+            fetched = self.model.fetch_specific_tables_state(
+                tables, batch_size, progress_callback, fast_mode=self.fast_mode, stop_event=self.stop_event,
+                meta=self.initial_meta, checkpoint=checkpoint
+            )
+        finally:
+            if fetched[0] is None:
+                self.model.drop_shadow_tables(self.initial_meta)
+        self.initial_state, self.initial_columns = fetched
         if self.initial_state is None and self.initial_columns is None:
             return None, None
+        if checkpoint:
+            checkpoint.discard()
+        if self.model.config['history_auto_save']:
+            self.model.snapshot_store.save(self.initial_state, self.initial_columns, self.initial_meta, 'initial')
         return self.initial_state, self.initial_columns
     
-    def fetch_current_state(self, batch_size=1000, progress_callback=None):
+    def fetch_current_state(self, batch_size=None, progress_callback=None):
         self.stop_event.clear()
+        self.model.recorder.set_stage('current')
         tables = self.selected_tables or self.model.get_tables()
+        self.current_meta = {table: dict(meta) for table, meta in self.initial_meta.items() if table in tables}
+        self.current_from_history = False
         self.current_state, self.current_columns = self.model.fetch_specific_tables_state(
-            tables, batch_size, progress_callback, fast_mode=self.fast_mode, stop_event=self.stop_event
+            tables, batch_size, progress_callback, fast_mode=self.fast_mode, stop_event=self.stop_event,
+            meta=self.current_meta
         )
         if self.current_state is None and self.current_columns is None:
             return None, None
+        if self.model.config['history_auto_save']:
+            self.model.snapshot_store.save(self.current_state, self.current_columns, self.current_meta, 'current')
         return self.current_state, self.current_columns
     
+    def fetch_and_compare(self, batch_size=None, progress_callback=None):
+        config = self.model.config
+        if not config['pipelined_compare'] or config['history_auto_save']:
+            result = self.fetch_current_state(batch_size, progress_callback)
+            if result == (None, None):
+                return None
+            if progress_callback:
+                progress_callback("Comparing states...", 0, 1)
+            return self.compare_states(progress_callback)
+        self.stop_event.clear()
+        if not self.initial_state:
+            raise ValueError("Initial state not fetched")
+        self.model.recorder.set_stage('current')
+        tables = self.selected_tables or self.model.get_tables()
+        self.current_meta = {table: dict(meta) for table, meta in self.initial_meta.items() if table in tables}
+        self.current_from_history = False
+        self.current_state = {}
+        self.current_columns = {}
+        self.difference_counts = {}
+        differences = []
+        ready = queue.Queue(maxsize=max(1, config['fetch_workers']))
+        def produce():
+            try:
+                result = self.model.fetch_specific_tables_state(
+                    tables, batch_size, progress_callback, fast_mode=self.fast_mode, stop_event=self.stop_event,
+                    meta=self.current_meta, on_table=lambda table, state, columns: ready.put(('table', table, state, columns))
+                )
+                ready.put(('done', result))
+            except Exception as exc:
+                ready.put(('error', exc))
+        producer = threading.Thread(target=produce)
+        producer.start()
+        pending = set(self.initial_state)
+        outcome = None
+        try:
+            while outcome is None:
+                kind, *payload = ready.get()
+                if kind != 'table':
+                    outcome = (kind, payload[0])
+                    continue
+                table, state, columns = payload
+                self.current_state[table] = state
+                self.current_columns[table] = columns
+                pending.discard(table)
+                if self._diff_pipelined_table(differences, table, state) is None:
+                    self.stop_event.set()
+                state = payload = None
+        finally:
+            while outcome is None:
+                self.stop_event.set()
+                kind, *payload = ready.get()
+                if kind != 'table':
+                    outcome = (kind, payload[0])
+            producer.join()
+        kind, result = outcome
+        if kind == 'error':
+            raise result
+        if result == (None, None) or self.stop_event.is_set():
+            return None
+        for table in pending:
+            if self._diff_pipelined_table(differences, table, {}) is None:
+                return None
+        return differences
+    
+    def _diff_pipelined_table(self, differences, table, state):
+        token = self.model.recorder.begin(table, 'diff', 'compare')
+        diff_start = len(differences)
+        differences.extend(self._schema_differences(table))
+        if isinstance(self.initial_state.get(table), ServerSideState):
+            compared = self._diff_table_server_side(differences, table)
+        else:
+            compared = self._diff_table_fast(
+                differences, table, self.initial_state.get(table, {}), state, self._column_layout(table)
+            )
+        if compared is None:
+            return None
+        self.model.recorder.end(token, compared)
+        self._record_difference_count(table, len(differences) - diff_start)
+        if self.model.config['free_initial_state']:
+            self.initial_state.pop(table, None)
+        return compared
+    
+    def take_snapshot(self, label=None, batch_size=None, progress_callback=None):
+        self.stop_event.clear()
+        self.model.recorder.set_stage('snapshot')
+        tables = self.selected_tables or self.model.get_tables()
+        meta = {table: dict(table_meta) for table, table_meta in self.initial_meta.items() if table in tables}
+        states, columns = self.model.fetch_specific_tables_state(
+            tables, batch_size, progress_callback, fast_mode=self.fast_mode, stop_event=self.stop_event, meta=meta
+        )
+        if states is None and columns is None:
+            return None
+        return self.model.snapshot_store.save(states, columns, meta, label)
+    
+    def compare_snapshots(self, old_id, new_id, progress_callback=None):
+        store = self.model.snapshot_store
+        self.model.drop_shadow_tables(self.initial_meta)
+        self.model.last_snapshot = {}
+        if progress_callback:
+            progress_callback("Loading snapshots...", 0, 2)
+        self.initial_state, self.initial_columns, self.initial_meta = store.load(old_id)
+        if progress_callback:
+            progress_callback("Loading snapshots...", 1, 2)
+        self.current_state, self.current_columns, self.current_meta = store.load(new_id)
+        self.current_from_history = True
+        self.model.recorder.reset('compare')
+        return self.compare_states(progress_callback)
+    
     def compare_states_fast(self, progress_callback=None):
         self.stop_event.clear()
         if not self.initial_state:
             raise ValueError("Initial state not fetched")
+        self.model.recorder.set_stage('compare')
+        self.difference_counts = {}
         differences = []
         all_tables = set(list(self.initial_state.keys()) + list(self.current_state.keys()))
         total_tables = len(all_tables)
@@ -219,82 +2123,70 @@ class DatabaseController:
                 return None
             if progress_callback:
                 progress_callback(f"Comparing {table}...", i, total_tables)
-            columns = (self.initial_columns.get(table) or 
-                       self.current_columns.get(table) or 
-                       self.model.get_table_columns(table))
-            initial_table = self.initial_state.get(table, {})
-            current_table = self.current_state.get(table, {})
-            initial_keys = set(initial_table.keys())
-            current_keys = set(current_table.keys())
-            deleted_keys = initial_keys - current_keys
-            added_keys = current_keys - initial_keys
-            common_keys = initial_keys & current_keys
-            if progress_callback:
-                progress_callback(f"Processing deleted rows in {table}...", i, total_tables, 0.25)
-            if self.stop_event.is_set():
-                return None
-            for key in deleted_keys:
-                row = initial_table[key]
-                for idx, value in enumerate(row):
-                    col_name = columns[idx] if idx < len(columns) else f"Column {idx+1}"
-                    differences.append({
-                        'table': table,
-                        'id': key,
-                        'column_number': idx+1,
-                        'column_name': col_name,
-                        'old_value': str(value) if value is not None else '',
-                        'new_value': '',
-                        'change_type': 'deleted'
-                    })
-            if progress_callback:
-                progress_callback(f"Processing added rows in {table}...", i, total_tables, 0.5)
-            if self.stop_event.is_set():
+            token = self.model.recorder.begin(table, 'diff')
+            diff_start = len(differences)
+            differences.extend(self._schema_differences(table))
+            report = (lambda status, fraction, i=i, **details: progress_callback(status, i, total_tables, fraction, **details)) if progress_callback else None
+            if isinstance(self.initial_state.get(table), ServerSideState):
+                compared = self._diff_table_server_side(differences, table)
+            else:
+                compared = self._diff_table_fast(
+                    differences, table, self.initial_state.get(table, {}), self.current_state.get(table, {}),
+                    self._column_layout(table), report
+                )
+            if compared is None:
                 return None
-            for key in added_keys:
-                row = current_table[key]
-                for idx, value in enumerate(row):
-                    col_name = columns[idx] if idx < len(columns) else f"Column {idx+1}"
-                    differences.append({
-                        'table': table,
-                        'id': key,
-                        'column_number': idx+1,
-                        'column_name': col_name,
-                        'old_value': '',
-                        'new_value': str(value) if value is not None else '',
-                        'change_type': 'added'
-                    })
-            if progress_callback:
-                progress_callback(f"Processing modified rows in {table}...", i, total_tables, 0.75)
-            for j, key in enumerate(common_keys):
-                if j % 1000 == 0 and self.stop_event.is_set():
-                    return None
-                row_initial = initial_table[key]
-                row_current = current_table[key]
-                for idx, (val_initial, val_current) in enumerate(zip(row_initial, row_current)):
-                    str_val_initial = str(val_initial) if val_initial is not None else ''
-                    str_val_current = str(val_current) if val_current is not None else ''
-                    if str_val_initial != str_val_current:
-                        col_name = columns[idx] if idx < len(columns) else f"Column {idx+1}"
-                        differences.append({
-                            'table': table,
-                            'id': key,
-                            'column_number': idx+1,
-                            'column_name': col_name,
-                            'old_value': str_val_initial,
-                            'new_value': str_val_current,
-                            'change_type': 'modified'
-                        })
-                if progress_callback and j % 1000 == 0 and len(common_keys) > 0:
-                    sub_progress = 0.75 + (0.25 * j / len(common_keys))
-                    progress_callback(f"Processing modified rows in {table}...", i, total_tables, sub_progress)
+            self.model.recorder.end(token, compared)
+            self._record_difference_count(table, len(differences) - diff_start)
         return differences
     
+    def _diff_table_fast(self, differences, table, initial_table, current_table, layout, report=None):
+        columns, current_columns, pairs = layout
+        initial_keys = set(initial_table.keys())
+        current_keys = set(current_table.keys())
+        deleted_keys = self._ordered_keys(initial_table, initial_keys - current_keys)
+        added_keys = self._ordered_keys(current_table, current_keys - initial_keys)
+        common_keys = self._ordered_keys(initial_table, initial_keys & current_keys)
+        if report:
+            report(f"Processing deleted rows in {table}...", 0.25)
+        if self.stop_event.is_set():
+            return None
+        for key in deleted_keys:
+            self._append_row_difference(differences, table, key, initial_table[key], columns, 'deleted')
+        if report:
+            report(f"Processing added rows in {table}...", 0.5)
+        if self.stop_event.is_set():
+            return None
+        for key in added_keys:
+            self._append_row_difference(differences, table, key, current_table[key], current_columns, 'added')
+        if report:
+            report(f"Processing modified rows in {table}...", 0.75)
+        for j, key in enumerate(common_keys):
+            if j % 1000 == 0:
+                if self.stop_event.is_set():
+                    return None
+                if report:
+                    report(
+                        f"Processing modified rows in {table}...", 0.75 + (0.25 * j / len(common_keys)),
+                        table=table, rows=j, total_rows=len(common_keys)
+                    )
+            if pairs is None and self._same_stored_row(initial_table, current_table, key):
+                continue
+            row_initial = initial_table[key]
+            row_current = current_table[key]
+            if pairs is None and row_initial == row_current:
+                continue
+            self._diff_common_row(differences, table, key, row_initial, row_current, columns, pairs)
+        return len(initial_keys | current_keys)
+
     def compare_states(self, progress_callback=None):
         self.stop_event.clear()
         if self.fast_mode:
             return self.compare_states_fast(progress_callback)
         if not self.initial_state:
             raise ValueError("Initial state not fetched")
+        self.model.recorder.set_stage('compare')
+        self.difference_counts = {}
         differences = []
         all_tables = set(list(self.initial_state.keys()) + list(self.current_state.keys()))
         total_tables = len(all_tables)
@@ -303,78 +2195,388 @@ class DatabaseController:
                 return None
             if progress_callback:
                 progress_callback(f"Comparing {table}...", i, total_tables)
-            columns = (self.initial_columns.get(table) or 
-                      self.current_columns.get(table) or 
-                      self.model.get_table_columns(table))
+            token = self.model.recorder.begin(table, 'diff')
+            diff_start = len(differences)
+            columns, current_columns, pairs = self._column_layout(table)
+            differences.extend(self._schema_differences(table))
             initial_table = self.initial_state.get(table, {})
             current_table = self.current_state.get(table, {})
-            all_keys = set(list(initial_table.keys()) + list(current_table.keys()))
+            if isinstance(initial_table, ServerSideState):
+                compared = self._diff_table_server_side(differences, table)
+                if compared is None:
+                    return None
+                self.model.recorder.end(token, compared)
+                self._record_difference_count(table, len(differences) - diff_start)
+                continue
+            all_keys = self._ordered_keys(initial_table, set(list(initial_table.keys()) + list(current_table.keys())))
             total_keys = len(all_keys)
             for j, key in enumerate(all_keys):
                 if j % 100 == 0 and self.stop_event.is_set():
                     return None
                 if progress_callback and j % 100 == 0:
                     sub_progress = j / total_keys if total_keys > 0 else 1
-                    progress_callback(f"Comparing {table}...", i + sub_progress, total_tables)
+                    progress_callback(
+                        f"Comparing {table}...", i + sub_progress, total_tables,
+                        table=table, rows=j, total_rows=total_keys
+                    )
                 if key in initial_table and key not in current_table:
-                    row = initial_table[key]
-                    for idx, value in enumerate(row):
-                        col_name = columns[idx] if idx < len(columns) else f"Column {idx+1}"
-                        differences.append({
-                            'table': table,
-                            'id': key,
-                            'column_number': idx+1,
-                            'column_name': col_name,
-                            'old_value': str(value) if value is not None else '',
-                            'new_value': '',
-                            'change_type': 'deleted'
-                        })
+                    self._append_row_difference(differences, table, key, initial_table[key], columns, 'deleted')
                 elif key in current_table and key not in initial_table:
-                    row = current_table[key]
-                    for idx, value in enumerate(row):
-                        col_name = columns[idx] if idx < len(columns) else f"Column {idx+1}"
-                        differences.append({
-                            'table': table,
-                            'id': key,
-                            'column_number': idx+1,
-                            'column_name': col_name,
-                            'old_value': '',
-                            'new_value': str(value) if value is not None else '',
-                            'change_type': 'added'
-                        })
+                    self._append_row_difference(differences, table, key, current_table[key], current_columns, 'added')
                 elif key in initial_table and key in current_table:
+                    if pairs is None and self._same_stored_row(initial_table, current_table, key):
+                        continue
                     row_initial = initial_table[key]
                     row_current = current_table[key]
-                    for idx, (val_initial, val_current) in enumerate(zip(row_initial, row_current)):
-                        str_val_initial = str(val_initial) if val_initial is not None else ''
-                        str_val_current = str(val_current) if val_current is not None else ''
-                        if str_val_initial != str_val_current:
-                            col_name = columns[idx] if idx < len(columns) else f"Column {idx+1}"
-                            differences.append({
-                                'table': table,
-                                'id': key,
-                                'column_number': idx+1,
-                                'column_name': col_name,
-                                'old_value': str_val_initial,
-                                'new_value': str_val_current,
-                                'change_type': 'modified'
-                            })
+                    if pairs is None and row_initial == row_current:
+                        continue
+                    self._diff_common_row(differences, table, key, row_initial, row_current, columns, pairs)
+            self.model.recorder.end(token, total_keys)
+            self._record_difference_count(table, len(differences) - diff_start)
         return differences
     
+    def watch(self, on_differences, interval=None, progress_callback=None):
+        self.stop_event.clear()
+        config = self.model.config
+        interval = config['watch_interval'] if interval is None else interval
+        fingerprints = None
+        if not self.initial_state:
+            fingerprints = self.model.table_fingerprints(self.selected_tables or self.model.get_tables())
+            result = self.fetch_initial_state(progress_callback=progress_callback)
+            if result == (None, None):
+                return None
+        tables = [table for table, state in self.initial_state.items() if not isinstance(state, ServerSideState)]
+        for table in tables:
+            if table not in self.current_state:
+                self.current_state[table] = self.initial_state[table]
+                self.current_columns[table] = self.initial_columns.get(table)
+                self.current_meta[table] = dict(self.initial_meta.get(table) or {})
+        unchecked = set()
+        if fingerprints is None:
+            fingerprints = self.model.table_fingerprints(tables)
+            unchecked = set(tables)
+        delay = 0 if unchecked else interval
+        polls = 0
+        while not self.stop_event.wait(delay):
+            started = time.perf_counter()
+            self.model.recorder.set_stage('watch')
+            latest = self.model.table_fingerprints(tables)
+            changed = [table for table in tables
+                       if table in unchecked or latest[table] is None or latest[table] != fingerprints.get(table)]
+            unchecked = set()
+            fingerprints = latest
+            polls += 1
+            differences = []
+            if changed:
+                meta = {table: dict(self.initial_meta.get(table) or {}) for table in changed}
+                states, columns = self.model.fetch_specific_tables_state(
+                    changed, fast_mode=self.fast_mode, stop_event=self.stop_event, meta=meta
+                )
+                if states is None and columns is None:
+                    return polls
+                self.current_from_history = False
+                for table in changed:
+                    token = self.model.recorder.begin(table, 'diff', 'watch')
+                    layout = self._column_layout(table, self.current_columns.get(table), columns[table])
+                    table_differences = self._schema_differences(table, self.current_meta.get(table), meta[table])
+                    compared = self._diff_table_fast(
+                        table_differences, table, self.current_state.get(table, {}), states[table], layout
+                    )
+                    if compared is None:
+                        return polls
+                    self.model.recorder.end(token, compared)
+                    differences.extend(table_differences)
+                    self.current_state[table] = states[table]
+                    self.current_columns[table] = columns[table]
+                    self.current_meta[table] = meta[table]
+            on_differences(differences, changed)
+            elapsed = time.perf_counter() - started
+            delay = max(interval, elapsed * (1 - config['watch_max_load']) / config['watch_max_load'])
+        return polls
+
+    def _diff_table_server_side(self, differences, table):
+        initial_meta = self.initial_meta[table]
+        current_meta = self.current_meta.get(table) or initial_meta
+        columns, current_columns, pairs = self._column_layout(table)
+        initial_key = self.model.make_row_keyer(dict(initial_meta, fetch_mode='typed'))
+        current_key = self.model.make_row_keyer(dict(current_meta, fetch_mode='typed'))
+        compared = 0
+        rows = self.model.server_side_differences(table, initial_meta, current_meta)
+        try:
+            for change_type, row_initial, row_current in rows:
+                if compared % 1000 == 0 and self.stop_event.is_set():
+                    return None
+                compared += 1
+                if change_type == 'modified':
+                    self._diff_common_row(differences, table, initial_key(row_initial), row_initial, row_current, columns, pairs)
+                    continue
+                if change_type == 'deleted':
+                    self._append_row_difference(differences, table, initial_key(row_initial), row_initial, columns, change_type)
+                else:
+                    self._append_row_difference(differences, table, current_key(row_current), row_current, current_columns, change_type)
+        finally:
+            rows.close()
+        return compared
+    
+    def _ordered_keys(self, table_state, keys):
+        if not isinstance(table_state, CompressedTableState):
+            return keys
+        index = table_state.index
+        return sorted(keys, key=lambda key: index.get(key, len(index)))
+    
+    def _same_stored_row(self, initial_table, current_table, key):
+        return (isinstance(initial_table, CompressedTableState) and
+                isinstance(current_table, CompressedTableState) and
+                initial_table.same_row(current_table, key))
+    
+    def _record_difference_count(self, table, count):
+        self.difference_counts[table] = count
+    
+    def _report_context(self):
+        return {
+            'database': self.model.config['database'],
+            'fast_mode': self.fast_mode,
+            'pool': self.model.get_pool_stats(),
+            'differences': dict(self.difference_counts),
+            'snapshot': dict(self.model.last_snapshot),
+            'profile': self.model.config['profile'],
+            'memory': self.model.governor.stats(),
+            'snapshots': {
+                stage: {table: meta['snapshot'] for table, meta in metas.items() if meta.get('snapshot')}
+                for stage, metas in (('initial', self.initial_meta), ('current', self.current_meta))
+            }
+        }
+    
+    def performance_report(self):
+        return self.model.recorder.report(self._report_context())
+    
+    def save_performance_report(self):
+        report_dir = self.model.config['report_dir']
+        if not os.path.isabs(report_dir):
+            report_dir = os.path.join(self.model.script_directory, report_dir)
+        path = os.path.join(report_dir, f"perf_{time.strftime('%Y%m%d_%H%M%S')}.json")
+        return self.model.recorder.write_json(path, self._report_context())
+    
+    def _column_layout(self, table, columns=None, current_columns=None):
+        columns = (columns or
+                   self.initial_columns.get(table) or 
+                   self.current_columns.get(table) or 
+                   self.model.get_table_columns(table))
+        current_columns = current_columns or self.current_columns.get(table) or columns
+        if current_columns == columns:
+            return columns, current_columns, None
+        current_index = {col: idx for idx, col in enumerate(current_columns)}
+        pairs = [(idx, current_index[col]) for idx, col in enumerate(columns) if col in current_index]
+        return columns, current_columns, pairs
+    
+    def _diff_common_row(self, differences, table, key, row_initial, row_current, columns, pairs=None, summary=None):
+        if summary is None:
+            summary = self.result_mode == 'rows'
+        detail_pairs = pairs
+        if pairs is None:
+            pairs = [(idx, idx) for idx in range(min(len(row_initial), len(row_current)))]
+        changed = []
+        for idx, current_idx in pairs:
+            val_initial = row_initial[idx]
+            val_current = row_current[current_idx]
+            if val_initial == val_current:
+                continue
+            if summary:
+                changed.append(idx)
+                continue
+            str_val_initial = self._format_value(val_initial)
+            str_val_current = self._format_value(val_current)
+            if str_val_initial != str_val_current:
+                col_name = columns[idx] if idx < len(columns) else f"Column {idx+1}"
+                differences.append(self._cell_difference(
+                    table, key, self._format_key(table, key), idx, col_name, str_val_initial, str_val_current, 'modified'
+                ))
+        if changed:
+            differences.append({
+                'table': table,
+                'id': self._format_key(table, key),
+                'column_number': len(changed),
+                'column_name': ", ".join(columns[idx] if idx < len(columns) else f"Column {idx+1}" for idx in changed),
+                'old_value': '',
+                'new_value': '',
+                'change_type': 'modified',
+                'mask': sum(1 << idx for idx in changed),
+                'detail': (key, row_initial, row_current, columns, detail_pairs)
+            })
+    
+    def _append_row_difference(self, differences, table, key, row, columns, change_type, summary=None):
+        if summary is None:
+            summary = self.result_mode == 'rows'
+        deleted = change_type == 'deleted'
+        if summary:
+            differences.append({
+                'table': table,
+                'id': self._format_key(table, key),
+                'column_number': len(row),
+                'column_name': f"all {len(row)} columns",
+                'old_value': '',
+                'new_value': '',
+                'change_type': change_type,
+                'mask': (1 << len(row)) - 1,
+                'detail': (key, row if deleted else None, None if deleted else row, columns, None)
+            })
+            return
+        key_label = self._format_key(table, key)
+        for idx, value in enumerate(row):
+            col_name = columns[idx] if idx < len(columns) else f"Column {idx+1}"
+            differences.append(self._cell_difference(
+                table, key, key_label, idx, col_name,
+                self._format_value(value) if deleted else '',
+                '' if deleted else self._format_value(value),
+                change_type
+            ))
+    
+    def _cell_difference(self, table, key, key_label, idx, col_name, old_value, new_value, change_type):
+        difference = {
+            'table': table,
+            'id': key_label,
+            'column_number': idx+1,
+            'column_name': col_name,
+            'old_value': old_value,
+            'new_value': new_value,
+            'change_type': change_type
+        }
+        if (change_type != 'deleted' and not self.current_from_history and self._has_key(table) and
+                col_name in self._digest_columns(table) and self.is_digest_value(new_value)):
+            difference['digest_key'] = key
+        return difference
+    
+    def is_digest_value(self, value):
+        return self.DIGEST_PATTERN.match(value) is not None
+    
+    def _has_key(self, table):
+        meta = self.current_meta.get(table) or self.initial_meta.get(table) or {}
+        return bool(meta.get('key'))
+    
+    def _digest_columns(self, table):
+        meta = self.current_meta.get(table) or self.initial_meta.get(table) or {}
+        return meta.get('digest_columns') or ()
+    
+    def fetch_full_value(self, difference):
+        table = difference['table']
+        meta = self.current_meta.get(table) or self.initial_meta.get(table) or self.model.build_table_meta(table)
+        value = self.model.fetch_full_value(table, meta, difference['digest_key'], difference['column_name'])
+        return self._format_value(value)
+    
+    def value_diff(self, old_value, new_value):
+        try:
+            old_lines = json.dumps(json.loads(old_value), indent=2, sort_keys=True).splitlines()
+            new_lines = json.dumps(json.loads(new_value), indent=2, sort_keys=True).splitlines()
+        except ValueError:
+            old_lines = old_value.splitlines()
+            new_lines = new_value.splitlines()
+        return "\n".join(difflib.unified_diff(old_lines, new_lines, "old value", "new value", lineterm=""))
+    
+    def expand_difference(self, entry):
+        detail = entry.get('detail')
+        if detail is None:
+            return [entry]
+        key, row_initial, row_current, columns, pairs = detail
+        cells = []
+        if entry['change_type'] == 'modified':
+            self._diff_common_row(cells, entry['table'], key, row_initial, row_current, columns, pairs, summary=False)
+        elif entry['change_type'] == 'deleted':
+            self._append_row_difference(cells, entry['table'], key, row_initial, columns, 'deleted', summary=False)
+        else:
+            self._append_row_difference(cells, entry['table'], key, row_current, columns, 'added', summary=False)
+        return cells
+    
+    def expand_differences(self, differences):
+        expanded = []
+        for entry in differences:
+            expanded.extend(self.expand_difference(entry))
+        return expanded
+    
+    def _schema_differences(self, table, initial_meta=None, current_meta=None):
+        initial_meta = initial_meta or self.initial_meta.get(table) or {}
+        current_meta = current_meta or self.current_meta.get(table) or {}
+        initial_schema = initial_meta.get('schema')
+        current_schema = current_meta.get('schema')
+        if not initial_schema or not current_schema or initial_schema == current_schema:
+            return []
+        changes = []
+        def record(position, name, old_value, new_value):
+            changes.append({
+                'table': table,
+                'id': '(schema)',
+                'column_number': position,
+                'column_name': name,
+                'old_value': old_value,
+                'new_value': new_value,
+                'change_type': 'schema'
+            })
+        initial_types = {name: column_type for name, column_type in initial_schema}
+        current_types = {name: column_type for name, column_type in current_schema}
+        initial_positions = {name: idx + 1 for idx, (name, _) in enumerate(initial_schema)}
+        current_positions = {name: idx + 1 for idx, (name, _) in enumerate(current_schema)}
+        for name, column_type in initial_schema:
+            if name not in current_types:
+                record(initial_positions[name], name, f"{column_type} (dropped)", '')
+            elif current_types[name] != column_type:
+                record(current_positions[name], name, column_type, current_types[name])
+        for name, column_type in current_schema:
+            if name not in initial_types:
+                record(current_positions[name], name, '', f"{column_type} (added)")
+        common_initial = [name for name, _ in initial_schema if name in current_types]
+        common_current = [name for name, _ in current_schema if name in initial_types]
+        if common_initial != common_current:
+            for name in common_current:
+                if common_initial.index(name) != common_current.index(name):
+                    record(current_positions[name], name, f"position {initial_positions[name]}", f"position {current_positions[name]}")
+        if (initial_meta.get('key') or []) != (current_meta.get('key') or []):
+            record(0, 'key', ', '.join(initial_meta.get('key') or []) or '(none)', ', '.join(current_meta.get('key') or []) or '(none)')
+        return changes
+    
+    def _format_value(self, value):
+        if value is None:
+            return ''
+        if isinstance(value, (bytes, bytearray)):
+            try:
+                return value.decode('utf-8')
+            except UnicodeDecodeError:
+                return '0x' + value.hex()
+        return str(value)
+    
+    def _format_key(self, table, key):
+        meta = self.initial_meta.get(table) or self.current_meta.get(table) or {}
+        key_columns = meta.get('key') or []
+        if not key_columns:
+            digest, occurrence = key
+            return f"row {digest.hex()}" + (f" #{occurrence + 1}" if occurrence else "")
+        if len(key_columns) == 1:
+            return f"{key_columns[0]}={self._format_value(key)}"
+        return ", ".join(f"{col}={self._format_value(value)}" for col, value in zip(key_columns, key))
+    
     def request_stop(self):
         self.stop_event.set()
     
     def clear_states(self):
+        self.model.drop_shadow_tables(self.initial_meta)
         self.initial_state = {}
         self.initial_columns = {}
+        self.initial_meta = {}
         self.current_state = {}
         self.current_columns = {}
+        self.current_meta = {}
+        self.current_from_history = False
     
     def set_selected_tables(self, tables):
         self.selected_tables = tables
         
     def set_fast_mode(self, enabled):
         self.fast_mode = enabled
+    
+    def set_result_mode(self, mode):
+        self.result_mode = mode
+    
+    def apply_config(self):
+        self.fast_mode = self.model.config['fetch_strategy'] == 'fast'
+        self.result_mode = self.model.config['result_mode']
 
 class DatabaseCompareView(tk.Frame):
     def __init__(self, parent, controller):
@@ -384,13 +2586,19 @@ class DatabaseCompareView(tk.Frame):
         self.result_data = []
         self.sort_column = None
         self.sort_order = True
-        self.page_size = 100
+        self.page_size = controller.model.config['page_size']
         self.current_page = 0
         self.filtered_data = []
         self.filter_text = ""
         self.selected_tables = None
-        self.fast_mode = tk.BooleanVar(value=False)
+        self.fast_mode = tk.BooleanVar(value=controller.fast_mode)
+        self.row_summary = tk.BooleanVar(value=controller.result_mode == 'rows')
         self.is_operation_running = False
+        self.watching = False
+        self.progress = ProgressTracker()
+        self.progress_interval = 100
+        self._progress_job = None
+        self.performance_report_path = None
         parent.title(f"Database Comparer: {controller.model.config['database']}")
         self.create_widgets()
         self.create_menu()
@@ -409,12 +2617,16 @@ class DatabaseCompareView(tk.Frame):
         menubar = tk.Menu(self.parent)
         file_menu = tk.Menu(menubar, tearoff=0)
         file_menu.add_command(label="Export to CSV File...", command=self.export_to_csv_file)
+        file_menu.add_command(label="Export to CSV File (Detailed)...", command=lambda: self.export_to_csv_file(detailed=True))
         file_menu.add_command(label="Export to Clipboard", command=self.export_to_clipboard)
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=self.parent.quit)
         menubar.add_cascade(label="File", menu=file_menu)
         view_menu = tk.Menu(menubar, tearoff=0)
         view_menu.add_command(label="Refresh", command=self.refresh_view)
+        view_menu.add_command(label="Performance...", command=self.show_performance)
+        view_menu.add_command(label="Snapshot History...", command=self.show_history)
+        view_menu.add_checkbutton(label="Row Summary Results", variable=self.row_summary, command=self.toggle_row_summary)
         view_menu.add_separator()
         page_menu = tk.Menu(view_menu, tearoff=0)
         for size in [50, 100, 200, 500, 1000]:
@@ -441,6 +2653,8 @@ class DatabaseCompareView(tk.Frame):
         self.fetch_state_button.pack(side="left", padx=5)
         self.compare_states_button = ttk.Button(self.button_frame, text="Compare States", command=self.on_compare_states)
         self.compare_states_button.pack(side="left", padx=5)
+        self.watch_button = ttk.Button(self.button_frame, text="Watch", command=self.on_watch)
+        self.watch_button.pack(side="left", padx=5)
         self.export_csv_button = ttk.Button(self.button_frame, text="Copy CSV to Clipboard", command=self.export_to_clipboard)
         self.export_csv_button.pack(side="left", padx=5)
         self.clear_all_button = ttk.Button(self.button_frame, text="Clear All", command=self.clear_all)
@@ -457,7 +2671,7 @@ class DatabaseCompareView(tk.Frame):
         self.filter_entry = ttk.Entry(self.filter_frame, textvariable=self.filter_var, width=30)
         self.filter_entry.pack(side="left", fill="x", expand=True, padx=(0, 5))
         self.filter_column_var = tk.StringVar(value="All Columns")
-        self.filter_column_combo = ttk.Combobox(self.filter_frame, textvariable=self.filter_column_var, values=["All Columns", "Table", "ID", "Column Name", "Old Value", "New Value"], state="readonly", width=15)
+        self.filter_column_combo = ttk.Combobox(self.filter_frame, textvariable=self.filter_column_var, values=["All Columns", "Table", "Key", "Column Name", "Old Value", "New Value"], state="readonly", width=15)
         self.filter_column_combo.pack(side="left", padx=5)
         self.filter_column_combo.bind("<<ComboboxSelected>>", lambda e: self.apply_filter())
         self.status_var = tk.StringVar(value="Ready")
@@ -471,7 +2685,7 @@ class DatabaseCompareView(tk.Frame):
         self.columns = ("table", "id", "column_number", "column_name", "old_value", "new_value")
         self.result_tree = ttk.Treeview(self.tree_frame, columns=self.columns, show="headings", selectmode="browse")
         self.result_tree.heading("table", text="Table", command=lambda: self.sort_by_column("table"))
-        self.result_tree.heading("id", text="ID (First Column Value)", command=lambda: self.sort_by_column("id"))
+        self.result_tree.heading("id", text="Key", command=lambda: self.sort_by_column("id"))
         self.result_tree.heading("column_number", text="Column Number", command=lambda: self.sort_by_column("column_number"))
         self.result_tree.heading("column_name", text="Column Name", command=lambda: self.sort_by_column("column_name"))
         self.result_tree.heading("old_value", text="Old Value", command=lambda: self.sort_by_column("old_value"))
@@ -492,6 +2706,7 @@ class DatabaseCompareView(tk.Frame):
         self.result_tree.tag_configure('added', background='#e6ffe6')
         self.result_tree.tag_configure('modified', background='#fff0e6')
         self.result_tree.tag_configure('deleted', background='#ffe6e6')
+        self.result_tree.tag_configure('schema', background='#e6f0ff')
         self.pagination_frame = ttk.Frame(main_frame)
         self.pagination_frame.pack(fill="x", pady=(5, 0), before=self.status_bar)
         self.prev_page_button = ttk.Button(self.pagination_frame, text="◀ Previous", command=self.prev_page, state="disabled")
@@ -527,6 +2742,14 @@ class DatabaseCompareView(tk.Frame):
         else:
             self.status_var.set("Normal mode enabled - using batched processing")
     
+    def toggle_row_summary(self):
+        if self.row_summary.get():
+            self.controller.set_result_mode('rows')
+            self.status_var.set("Row summary enabled - one result per changed row, double-click to expand")
+        else:
+            self.controller.set_result_mode('cells')
+            self.status_var.set("Cell results enabled - one result per changed column")
+    
     def on_fetch_state(self):
         if self.is_operation_running:
             messagebox.showinfo("Operation in Progress", "An operation is already running. Please wait or click STOP.")
@@ -535,15 +2758,25 @@ class DatabaseCompareView(tk.Frame):
             response = messagebox.askyesno("Confirm Action", "This will overwrite the existing initial state. Continue?")
             if not response:
                 return
+        resume = True
+        pending = self.controller.pending_checkpoint()
+        if pending:
+            resume = messagebox.askyesno(
+                "Resume Fetch",
+                f"An interrupted fetch of '{pending['database']}' from {pending['created']} was found "
+                f"({pending['done']} of {pending['tables']} tables complete, {pending['rows']:,} rows saved).\n\n"
+                "Resume it? Choose No to start over."
+            )
         self.is_operation_running = True
         self.set_buttons_state("disabled")
         self.status_var.set("Fetching database state...")
         self.progress_var.set(0)
-        threading.Thread(target=self._fetch_state_thread).start()
+        self._start_progress_polling("Fetching database state...")
+        threading.Thread(target=self._fetch_state_thread, args=(resume,)).start()
     
-    def _fetch_state_thread(self):
+    def _fetch_state_thread(self, resume=True):
         try:
-            result = self.controller.fetch_initial_state(progress_callback=self._update_progress)
+            result = self.controller.fetch_initial_state(progress_callback=self._update_progress, resume=resume)
             if result == (None, None):
                 self.parent.after(0, self._operation_stopped)
                 return
@@ -555,16 +2788,24 @@ class DatabaseCompareView(tk.Frame):
             self.parent.after(0, lambda: setattr(self, 'is_operation_running', False))
     
     def _operation_stopped(self):
+        self._stop_progress_polling()
         self.set_buttons_state("normal")
         self.status_var.set("Operation stopped by user.")
         self.progress_var.set(0)
     
     def _fetch_state_complete(self):
+        self._stop_progress_polling()
         self.set_buttons_state("normal")
         self.status_var.set("Database state fetched successfully.")
         self.progress_var.set(100)
+        self._show_snapshot_warning()
         messagebox.showinfo("Database Comparer", "Database state fetched successfully.")
     
+    def _show_snapshot_warning(self):
+        warning = self.controller.model.last_snapshot.get('warning')
+        if warning:
+            messagebox.showwarning("Consistent Snapshot", warning)
+    
     def on_compare_states(self):
         if self.is_operation_running:
             messagebox.showinfo("Operation in Progress", "An operation is already running. Please wait or click STOP.")
@@ -576,18 +2817,12 @@ class DatabaseCompareView(tk.Frame):
         self.set_buttons_state("disabled")
         self.status_var.set("Comparing database states...")
         self.progress_var.set(0)
+        self._start_progress_polling("Fetching current state...")
         threading.Thread(target=self._compare_states_thread).start()
     
     def _compare_states_thread(self):
         try:
-            self.parent.after(0, lambda: self.status_var.set("Fetching current state..."))
-            result = self.controller.fetch_current_state(progress_callback=self._update_progress)
-            if result == (None, None):
-                self.parent.after(0, self._operation_stopped)
-                return
-            self.parent.after(0, lambda: self.status_var.set("Comparing states..."))
-            self.parent.after(0, lambda: self.progress_var.set(0))
-            differences = self.controller.compare_states(progress_callback=self._update_progress)
+            differences = self.controller.fetch_and_compare(progress_callback=self._update_progress)
             if differences is None:
                 self.parent.after(0, self._operation_stopped)
                 return
@@ -601,15 +2836,76 @@ class DatabaseCompareView(tk.Frame):
             self.parent.after(0, lambda: setattr(self, 'is_operation_running', False))
     
     def _compare_states_complete(self):
+        self._stop_progress_polling()
         self.set_buttons_state("normal")
         self.status_var.set(f"Comparison complete. Found {len(self.result_data)} differences.")
         self.progress_var.set(100)
-        self.apply_filter()
-        self.current_page = 0
-        self.update_pagination()
-        self.display_page()
+        recorder = self.controller.model.recorder
+        recorder.set_stage('render')
+        with recorder.phase('*', 'render') as counters:
+            self.apply_filter()
+            self.current_page = 0
+            self.update_pagination()
+            self.display_page()
+            counters['rows'] = len(self.result_data)
+        self._save_performance_report()
+        self._show_snapshot_warning()
         messagebox.showinfo("Database Comparer", f"Database comparison complete. Found {len(self.result_data)} differences.")
     
+    def _save_performance_report(self):
+        try:
+            self.performance_report_path = self.controller.save_performance_report()
+        except Exception:
+            self.performance_report_path = None
+    
+    def on_watch(self):
+        if self.watching:
+            self.controller.request_stop()
+            self.status_var.set("Stopping watch...")
+            return
+        if self.is_operation_running:
+            messagebox.showinfo("Operation in Progress", "An operation is already running. Please wait or click STOP.")
+            return
+        self.is_operation_running = True
+        self.watching = True
+        self.set_buttons_state("disabled")
+        self.watch_button.config(text="Stop Watching")
+        self.progress_var.set(0)
+        status = "Watching for changes..." if self.controller.initial_state else "Fetching baseline state..."
+        self._start_progress_polling(status)
+        threading.Thread(target=self._watch_thread).start()
+    
+    def _watch_thread(self):
+        try:
+            self.controller.watch(self._on_watch_differences, progress_callback=self._update_progress)
+            self.parent.after(0, self._watch_stopped)
+        except Exception as exc:
+            error_message = str(exc)
+            self.parent.after(0, lambda: self._show_error(f"Error while watching: {error_message}"))
+        finally:
+            self.parent.after(0, lambda: setattr(self, 'is_operation_running', False))
+            self.parent.after(0, lambda: setattr(self, 'watching', False))
+            self.parent.after(0, lambda: self.watch_button.config(text="Watch"))
+    
+    def _on_watch_differences(self, differences, changed_tables):
+        checked = time.strftime('%H:%M:%S')
+        if differences:
+            self.progress.reset(f"Watching - {len(differences)} new differences in {', '.join(changed_tables)} at {checked}")
+            self.parent.after(0, lambda: self._append_watch_differences(differences))
+        else:
+            self.progress.reset(f"Watching - no changes at {checked}")
+    
+    def _append_watch_differences(self, differences):
+        self.result_data = differences + self.result_data
+        self.apply_filter()
+    
+    def _watch_stopped(self):
+        self._stop_progress_polling()
+        self.set_buttons_state("normal")
+        self.progress_var.set(0)
+        self._save_performance_report()
+        self.status_var.set(f"Watch stopped. {len(self.result_data)} differences recorded.")
+    
     def display_page(self):
         self.result_tree.delete(*self.result_tree.get_children())
         if not self.filtered_data:
@@ -696,7 +2992,7 @@ class DatabaseCompareView(tk.Frame):
             else:
                 column_map = {
                     "Table": "table",
-                    "ID": "id",
+                    "Key": "id",
                     "Column Name": "column_name",
                     "Old Value": "old_value",
                     "New Value": "new_value"
@@ -723,17 +3019,60 @@ class DatabaseCompareView(tk.Frame):
             return
         col_idx = int(column_id.replace("#", "")) - 1
         column_name = self.columns[col_idx]
-        if column_name not in ("old_value", "new_value"):
-            return
         item_idx = self.result_tree.index(item_id)
         page_start = self.current_page * self.page_size
         data_idx = page_start + item_idx
         if data_idx >= len(self.filtered_data):
             return
-        full_value = self.filtered_data[data_idx][column_name]
-        self.show_value_dialog(full_value, column_name.replace("_", " ").title())
+        if 'detail' in self.filtered_data[data_idx]:
+            self.expand_summary_row(data_idx)
+            return
+        if column_name not in ("old_value", "new_value"):
+            return
+        entry = self.filtered_data[data_idx]
+        title = column_name.replace("_", " ").title()
+        if column_name == "new_value" and 'digest_key' in entry:
+            self.status_var.set(f"Fetching full value of {entry['table']}.{entry['column_name']}...")
+            threading.Thread(target=self._fetch_full_value_thread, args=(entry, title), daemon=True).start()
+            return
+        value = entry[column_name]
+        if self.controller.is_digest_value(value):
+            self.show_value_dialog(f"{value}\n\nOnly a digest of this value was stored, so the full value is not available here.", title)
+            return
+        compare = None
+        if entry.get('change_type') == 'modified' and not any(
+                self.controller.is_digest_value(entry[name]) for name in ("old_value", "new_value")):
+            compare = (entry['old_value'], entry['new_value'])
+        self.show_value_dialog(value, title, compare)
+    
+    def _fetch_full_value_thread(self, entry, title):
+        try:
+            value = self.controller.fetch_full_value(entry)
+            compare = None
+            if entry.get('change_type') == 'modified' and not self.controller.is_digest_value(entry['old_value']):
+                compare = (entry['old_value'], value)
+            def complete():
+                self.status_var.set(f"Fetched {len(value):,} characters of {entry['table']}.{entry['column_name']}.")
+                self.show_value_dialog(value, f"{title} (current)", compare)
+            self.parent.after(0, complete)
+        except Exception as exc:
+            error_message = str(exc)
+            self.parent.after(0, lambda: self._show_error(f"Error fetching value: {error_message}"))
     
-    def show_value_dialog(self, value, title):
+    def expand_summary_row(self, data_idx):
+        entry = self.filtered_data[data_idx]
+        cells = self.controller.expand_difference(entry)
+        self.filtered_data[data_idx:data_idx + 1] = cells
+        if self.result_data is not self.filtered_data:
+            for idx, candidate in enumerate(self.result_data):
+                if candidate is entry:
+                    self.result_data[idx:idx + 1] = cells
+                    break
+        self.update_pagination()
+        self.display_page()
+        self.status_var.set(f"Expanded {entry['table']} {entry['id']} into {len(cells)} column change(s).")
+    
+    def show_value_dialog(self, value, title, compare=None):
         dialog = tk.Toplevel(self.parent)
         dialog.title(title)
         dialog.geometry("600x400")
@@ -753,6 +3092,13 @@ class DatabaseCompareView(tk.Frame):
         button_frame.pack(fill="x", pady=10)
         copy_button = ttk.Button(button_frame, text="Copy to Clipboard", command=lambda: self.copy_to_clipboard(value, dialog))
         copy_button.pack(side="left", padx=5)
+        if compare:
+            def show_diff():
+                text.delete("1.0", "end")
+                text.insert("1.0", self.controller.value_diff(*compare) or "No line differences.")
+                diff_button.config(state="disabled")
+            diff_button = ttk.Button(button_frame, text="Show Diff", command=show_diff)
+            diff_button.pack(side="left", padx=5)
         close_button = ttk.Button(button_frame, text="Close", command=dialog.destroy)
         close_button.pack(side="right", padx=5)
         if re.match(r'^\s*\{.*\}\s*$', value) or re.match(r'^\s*\[.*\]\s*$', value):
@@ -782,7 +3128,7 @@ class DatabaseCompareView(tk.Frame):
             writer = csv.writer(output)
             writer.writerow([
                 "Table", 
-                "ID (First Column Value)", 
+                "Key", 
                 "Column Number", 
                 "Column Name", 
                 "Old Value", 
@@ -807,7 +3153,7 @@ class DatabaseCompareView(tk.Frame):
         except Exception as e:
             self._show_error(f"Error exporting CSV: {str(e)}")
     
-    def export_to_csv_file(self):
+    def export_to_csv_file(self, detailed=False):
         if not self.result_data:
             messagebox.showinfo("Database Comparer", "No results to export.")
             return
@@ -819,14 +3165,17 @@ class DatabaseCompareView(tk.Frame):
                 writer = csv.writer(csvfile)
                 writer.writerow([
                     "Table", 
-                    "ID (First Column Value)", 
+                    "Key", 
                     "Column Number", 
                     "Column Name", 
                     "Old Value", 
                     "New Value",
                     "Change Type"
                 ])
-                for row in self.filtered_data:
+                rows = self.filtered_data
+                if detailed:
+                    rows = (cell for entry in self.filtered_data for cell in self.controller.expand_difference(entry))
+                for row in rows:
                     writer.writerow([
                         row['table'],
                         row['id'],
@@ -909,6 +3258,12 @@ class DatabaseCompareView(tk.Frame):
                     if not shown and table != "Select All":
                         ttk.Checkbutton(check_frame, text=table, variable=table_vars[table]).pack(anchor="w", padx=5, pady=2)
         search_var.trace("w", filter_tables)
+        rules_frame = ttk.Frame(dialog)
+        rules_frame.pack(fill="x", padx=10, pady=(5, 0))
+        ttk.Label(rules_frame, text="Table rules for:").pack(side="left")
+        rules_table_var = tk.StringVar(value=tables[0] if tables else "")
+        ttk.Combobox(rules_frame, textvariable=rules_table_var, values=tables, state="readonly").pack(side="left", fill="x", expand=True, padx=5)
+        ttk.Button(rules_frame, text="Edit Rules...", command=lambda: self.edit_table_rules(rules_table_var.get(), dialog) if rules_table_var.get() else None).pack(side="left")
         button_frame = ttk.Frame(dialog)
         button_frame.pack(fill="x", padx=10, pady=10)
         def apply_selection():
@@ -929,11 +3284,73 @@ class DatabaseCompareView(tk.Frame):
             all_selected = all(var.get() for var in table_vars.values())
             select_all_var.set(all_selected)
     
+    def edit_table_rules(self, table, parent=None):
+        model = self.controller.model
+        columns = model.get_table_columns(table)
+        rules = model.table_rules.get(table, {})
+        excluded = set(model.get_table_rules(table)['exclude'])
+        key_columns = model.get_table_key(table)
+        dialog = tk.Toplevel(parent or self.parent)
+        dialog.title(f"Table Rules: {table}")
+        dialog.geometry("350x520")
+        dialog.minsize(300, 300)
+        dialog.transient(parent or self.parent)
+        dialog.grab_set()
+        ttk.Label(dialog, text="Unchecked columns are never fetched, hashed or compared.", wraplength=320).pack(fill="x", padx=10, pady=(10, 5))
+        list_frame = ttk.Frame(dialog)
+        list_frame.pack(fill="both", expand=True, padx=10, pady=5)
+        canvas = tk.Canvas(list_frame)
+        scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=canvas.yview)
+        scrollbar.pack(side="right", fill="y")
+        canvas.pack(side="left", fill="both", expand=True)
+        canvas.configure(yscrollcommand=scrollbar.set)
+        check_frame = ttk.Frame(canvas)
+        canvas.create_window((0, 0), window=check_frame, anchor="nw")
+        check_frame.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
+        column_vars = {}
+        for column in columns:
+            var = tk.BooleanVar(value=column not in excluded)
+            column_vars[column] = var
+            check = ttk.Checkbutton(check_frame, text=column, variable=var)
+            if column in key_columns:
+                var.set(True)
+                check.config(state="disabled")
+            check.pack(anchor="w", padx=5, pady=2)
+        include_frame = ttk.Frame(dialog)
+        include_frame.pack(fill="x", padx=10, pady=5)
+        ttk.Label(include_frame, text="Include only:").pack(side="left")
+        include_var = tk.StringVar(value=", ".join(rules.get('include', [])))
+        ttk.Entry(include_frame, textvariable=include_var).pack(side="left", fill="x", expand=True, padx=5)
+        filter_frame = ttk.Frame(dialog)
+        filter_frame.pack(fill="x", padx=10, pady=5)
+        ttk.Label(filter_frame, text="WHERE:").grid(row=0, column=0, sticky="w")
+        where_var = tk.StringVar(value=rules.get('where', ''))
+        ttk.Entry(filter_frame, textvariable=where_var).grid(row=0, column=1, sticky="ew", padx=5, pady=2)
+        ttk.Label(filter_frame, text="Sample 1 in N:").grid(row=1, column=0, sticky="w")
+        sample_var = tk.StringVar(value=str(rules.get('sample') or ""))
+        ttk.Entry(filter_frame, textvariable=sample_var).grid(row=1, column=1, sticky="ew", padx=5, pady=2)
+        filter_frame.columnconfigure(1, weight=1)
+        button_frame = ttk.Frame(dialog)
+        button_frame.pack(fill="x", padx=10, pady=10)
+        def save_rules():
+            exclude = [column for column, var in column_vars.items() if not var.get()]
+            include = model._split_list(include_var.get())
+            try:
+                sample = int(sample_var.get() or 0)
+                model.save_table_rules(table, include=include, exclude=exclude, where=where_var.get(), sample=sample)
+            except Exception as e:
+                messagebox.showerror("Error", f"Error saving table rules: {str(e)}")
+                return
+            self.status_var.set(f"Table rules for {table} saved ({len(exclude)} columns excluded)")
+            dialog.destroy()
+        ttk.Button(button_frame, text="Save", command=save_rules).pack(side="right", padx=5)
+        ttk.Button(button_frame, text="Cancel", command=dialog.destroy).pack(side="right", padx=5)
+    
     def show_settings(self):
         dialog = tk.Toplevel(self.parent)
         dialog.title("Settings")
-        dialog.geometry("400x300")
-        dialog.minsize(300, 250)
+        dialog.geometry("460x480")
+        dialog.minsize(300, 300)
         dialog.transient(self.parent)
         dialog.grab_set()
         notebook = ttk.Notebook(dialog)
@@ -955,6 +3372,12 @@ class DatabaseCompareView(tk.Frame):
         ttk.Label(db_frame, text="Connection Pool Size:").grid(row=4, column=0, sticky="w", padx=5, pady=5)
         pool_var = tk.StringVar(value=str(self.controller.model.config.get('pool_size', 5)))
         ttk.Entry(db_frame, textvariable=pool_var).grid(row=4, column=1, sticky="ew", padx=5, pady=5)
+        ttk.Label(db_frame, text="Pool Wait Timeout (s):").grid(row=5, column=0, sticky="w", padx=5, pady=5)
+        pool_timeout_var = tk.StringVar(value=str(self.controller.model.config.get('pool_timeout', 30)))
+        ttk.Entry(db_frame, textvariable=pool_timeout_var).grid(row=5, column=1, sticky="ew", padx=5, pady=5)
+        ttk.Label(db_frame, text="Fetch Workers:").grid(row=6, column=0, sticky="w", padx=5, pady=5)
+        fetch_workers_var = tk.StringVar(value=str(self.controller.model.config.get('fetch_workers', 1)))
+        ttk.Entry(db_frame, textvariable=fetch_workers_var).grid(row=6, column=1, sticky="ew", padx=5, pady=5)
         db_frame.columnconfigure(1, weight=1)
         display_frame = ttk.Frame(notebook)
         notebook.add(display_frame, text="Display")
@@ -971,29 +3394,110 @@ class DatabaseCompareView(tk.Frame):
         deleted_color_var = tk.StringVar(value="#ffe6e6")
         ttk.Entry(display_frame, textvariable=deleted_color_var).grid(row=3, column=1, sticky="ew", padx=5, pady=5)
         display_frame.columnconfigure(1, weight=1)
+        model_config = self.controller.model.config
+        profiles = self.controller.model.get_profiles()
+        perf_frame = ttk.Frame(notebook)
+        notebook.add(perf_frame, text="Performance")
+        profile_var = tk.StringVar(value=model_config['profile'] if model_config['profile'] in profiles else "custom")
+        strategy_var = tk.StringVar(value=model_config['fetch_strategy'])
+        fetch_mode_var = tk.StringVar(value=model_config['fetch_mode'])
+        batch_var = tk.StringVar(value=model_config['batch_size'])
+        batch_mb_var = tk.StringVar(value=f"{model_config['batch_max_mb']:g}")
+        wire_var = tk.BooleanVar(value=model_config['compress'])
+        snapshot_codec_var = tk.StringVar(value=model_config['snapshot_compression'])
+        engine_var = tk.StringVar(value="server-side" if model_config['snapshot_mode'] == 'server' else
+                                  "pipelined" if model_config['pipelined_compare'] else "two-step")
+        result_mode_var = tk.StringVar(value=model_config['result_mode'])
+        memory_var = tk.StringVar(value=f"{model_config['memory_limit_mb']:g}")
+        fields = [
+            ("Profile:", ttk.Combobox(perf_frame, textvariable=profile_var, values=["custom"] + sorted(profiles), state="readonly")),
+            ("Fetch Strategy:", ttk.Combobox(perf_frame, textvariable=strategy_var, values=["batched", "fast"], state="readonly")),
+            ("Fetch Mode:", ttk.Combobox(perf_frame, textvariable=fetch_mode_var, values=["typed", "raw"], state="readonly")),
+            ("Batch Size (auto or rows):", ttk.Entry(perf_frame, textvariable=batch_var)),
+            ("Max Batch MB:", ttk.Entry(perf_frame, textvariable=batch_mb_var)),
+            ("Wire Compression:", ttk.Checkbutton(perf_frame, variable=wire_var)),
+            ("Snapshot Compression:", ttk.Combobox(perf_frame, textvariable=snapshot_codec_var,
+                                                   values=["none", "auto", "zstd", "lz4", "zlib"], state="readonly")),
+            ("Diff Engine:", ttk.Combobox(perf_frame, textvariable=engine_var, values=["pipelined", "two-step", "server-side"], state="readonly")),
+            ("Result Mode:", ttk.Combobox(perf_frame, textvariable=result_mode_var, values=["cells", "rows"], state="readonly")),
+            ("Memory Ceiling MB (0 = off):", ttk.Entry(perf_frame, textvariable=memory_var))
+        ]
+        for row, (label, widget) in enumerate(fields):
+            ttk.Label(perf_frame, text=label).grid(row=row, column=0, sticky="w", padx=5, pady=3)
+            widget.grid(row=row, column=1, sticky="w" if isinstance(widget, ttk.Checkbutton) else "ew", padx=5, pady=3)
+        perf_frame.columnconfigure(1, weight=1)
+        profile_vars = {
+            'fetch_strategy': strategy_var, 'fetch_mode': fetch_mode_var, 'batch_size': batch_var,
+            'batch_max_mb': batch_mb_var, 'snapshot_compression': snapshot_codec_var, 'result_mode': result_mode_var,
+            'memory_limit_mb': memory_var, 'fetch_workers': fetch_workers_var, 'pool_size': pool_var
+        }
+        applying = [False]
+        def apply_profile(event=None):
+            settings = profiles.get(profile_var.get())
+            if not settings:
+                return
+            applying[0] = True
+            for option, var in profile_vars.items():
+                if option in settings:
+                    var.set(settings[option])
+            if 'compress' in settings:
+                wire_var.set(settings['compress'].strip().lower() in ('1', 'yes', 'true', 'on'))
+            if 'snapshot_mode' in settings or 'pipelined_compare' in settings:
+                pipelined = settings.get('pipelined_compare', 'true').strip().lower() in ('1', 'yes', 'true', 'on')
+                engine_var.set("server-side" if settings.get('snapshot_mode') == 'server' else "pipelined" if pipelined else "two-step")
+            applying[0] = False
+        def mark_custom(*args):
+            if not applying[0]:
+                profile_var.set("custom")
+        fields[0][1].bind("<<ComboboxSelected>>", apply_profile)
+        for var in list(profile_vars.values()) + [wire_var, engine_var]:
+            var.trace_add("write", mark_custom)
         button_frame = ttk.Frame(dialog)
         button_frame.pack(fill="x", padx=10, pady=10)
         def save_settings():
             try:
+                pool_size = pool_var.get().strip().lower()
                 new_config = {
                     'host': host_var.get(),
                     'database': db_var.get(),
                     'user': user_var.get(),
                     'password': pass_var.get(),
-                    'pool_size': int(pool_var.get())
+                    'pool_size': 'auto' if pool_size == 'auto' else int(pool_size),
+                    'pool_timeout': float(pool_timeout_var.get()),
+                    'fetch_workers': int(fetch_workers_var.get()),
+                    'compress': str(wire_var.get()).lower()
                 }
-                config = configparser.ConfigParser()
-                config['mysql'] = {
-                    'host': new_config['host'],
-                    'database': new_config['database'],
-                    'user': new_config['user'],
-                    'password': new_config['password'],
-                    'pool_size': str(new_config['pool_size'])
+                batch_size = batch_var.get().strip().lower()
+                engine = engine_var.get()
+                performance_config = {
+                    'profile': '' if profile_var.get() == 'custom' else profile_var.get(),
+                    'fetch_strategy': strategy_var.get(),
+                    'fetch_mode': fetch_mode_var.get(),
+                    'batch_size': 'auto' if batch_size == 'auto' else int(batch_size),
+                    'batch_max_mb': float(batch_mb_var.get()),
+                    'snapshot_compression': snapshot_codec_var.get(),
+                    'pipelined_compare': str(engine != 'two-step').lower(),
+                    'snapshot_mode': 'server' if engine == 'server-side' else 'client',
+                    'result_mode': result_mode_var.get(),
+                    'memory_limit_mb': float(memory_var.get())
                 }
-                config_path = os.path.join(self.controller.model.script_directory, 'config.ini')
+                config_path = self.controller.model.config_path
+                config = configparser.ConfigParser()
+                config.read(config_path)
+                for section in ('mysql', 'performance', 'display'):
+                    if not config.has_section(section):
+                        config.add_section(section)
+                for key, value in new_config.items():
+                    config['mysql'][key] = str(value)
+                for key, value in performance_config.items():
+                    config['performance'][key] = str(value)
+                config['display']['page_size'] = page_size_var.get()
                 with open(config_path, 'w') as configfile:
                     config.write(configfile)
                 self.controller.model.reload_config()
+                self.controller.apply_config()
+                self.fast_mode.set(self.controller.fast_mode)
+                self.row_summary.set(self.controller.result_mode == 'rows')
                 self.page_size = int(page_size_var.get())
                 self.result_tree.tag_configure('added', background=added_color_var.get())
                 self.result_tree.tag_configure('modified', background=modified_color_var.get())
@@ -1009,6 +3513,183 @@ class DatabaseCompareView(tk.Frame):
         ttk.Button(button_frame, text="Save", command=save_settings).pack(side="right", padx=5)
         ttk.Button(button_frame, text="Cancel", command=dialog.destroy).pack(side="right", padx=5)
     
+    def show_performance(self):
+        report = self.controller.performance_report()
+        dialog = tk.Toplevel(self.parent)
+        dialog.title("Performance")
+        dialog.geometry("800x450")
+        dialog.minsize(500, 300)
+        dialog.transient(self.parent)
+        frame = ttk.Frame(dialog)
+        frame.pack(fill="both", expand=True, padx=10, pady=10)
+        columns = ("stage", "table", "phase", "wall_time", "rows", "mb", "wire_mb", "queries", "peak_mb")
+        headings = ("Stage", "Table", "Phase", "Time (s)", "Rows", "MB", "Wire MB", "Queries", "Process Peak MB")
+        tree = ttk.Treeview(frame, columns=columns, show="headings")
+        for column, heading in zip(columns, headings):
+            tree.heading(column, text=heading)
+            tree.column(column, width=90, minwidth=60, anchor="w" if column in ("stage", "table", "phase") else "e")
+        y_scrollbar = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+        y_scrollbar.pack(side="right", fill="y")
+        tree.configure(yscrollcommand=y_scrollbar.set)
+        tree.pack(side="left", fill="both", expand=True)
+        def add_row(stage, table, phase, record, tags=()):
+            tree.insert("", "end", values=(
+                stage,
+                table,
+                phase,
+                f"{record['wall_time']:.3f}",
+                f"{record['rows']:,}",
+                f"{record['bytes'] / (1024 * 1024):.1f}",
+                f"{record['wire_bytes'] / (1024 * 1024):.1f}" if record['wire_bytes'] else "",
+                record['queries'],
+                f"{record['process_peak_memory'] / (1024 * 1024):.0f}"
+            ), tags=tags)
+        for record in report['phases']:
+            add_row(record['stage'], record['table'], record['phase'], record)
+        for phase, total in report['totals'].items():
+            add_row("total", "", phase, total, ("total",))
+        tree.tag_configure("total", background="#e1e1e1")
+        pool = report['pool']
+        summary = (f"Pool: size {pool['pool_size']}, checkouts {pool['checkouts']}, peak in use {pool['peak_in_use']}, "
+                   f"avg wait {pool['avg_wait'] * 1000:.1f} ms, timeouts {pool['timeouts']}, recreated {pool['recreated']}")
+        ttk.Label(dialog, text=summary, anchor="w").pack(fill="x", padx=10)
+        snapshots = [stats for tables in report['snapshots'].values() for stats in tables.values()]
+        if snapshots:
+            raw_bytes = sum(stats['raw_bytes'] for stats in snapshots)
+            compressed_bytes = sum(stats['compressed_bytes'] for stats in snapshots)
+            ratio = raw_bytes / compressed_bytes if compressed_bytes else 0.0
+            codecs = ", ".join(sorted(set(stats['codec'] for stats in snapshots)))
+            ttk.Label(dialog, text=(f"Snapshots ({codecs}): {raw_bytes / (1024 * 1024):.1f} MB raw, "
+                                    f"{compressed_bytes / (1024 * 1024):.1f} MB stored, ratio {ratio:.1f}x"),
+                      anchor="w").pack(fill="x", padx=10)
+        memory = report['memory']
+        if memory['limit_bytes']:
+            ttk.Label(dialog, text=(f"Memory ceiling {memory['limit_bytes'] / (1024 * 1024):.0f} MB: "
+                                    f"current {memory['current_bytes'] / (1024 * 1024):.0f} MB, "
+                                    f"peak seen {memory['peak_bytes'] / (1024 * 1024):.0f} MB, {memory['spills']} spill(s), "
+                                    f"{memory['spilled_tables']} table(s) / {memory['spilled_bytes'] / (1024 * 1024):.1f} MB moved to disk"),
+                      anchor="w").pack(fill="x", padx=10)
+        if self.performance_report_path:
+            ttk.Label(dialog, text=f"Last report: {self.performance_report_path}", anchor="w").pack(fill="x", padx=10)
+        ttk.Button(dialog, text="Close", command=dialog.destroy).pack(pady=10)
+    
+    def show_history(self):
+        dialog = tk.Toplevel(self.parent)
+        dialog.title("Snapshot History")
+        dialog.geometry("760x420")
+        dialog.minsize(500, 300)
+        dialog.transient(self.parent)
+        frame = ttk.Frame(dialog)
+        frame.pack(fill="both", expand=True, padx=10, pady=10)
+        columns = ("label", "created", "tables", "rows", "raw_mb", "stored_mb")
+        headings = ("Label", "Created", "Tables", "Rows", "Raw MB", "New on disk MB")
+        tree = ttk.Treeview(frame, columns=columns, show="headings", selectmode="extended")
+        for column, heading in zip(columns, headings):
+            tree.heading(column, text=heading)
+            tree.column(column, width=110, minwidth=60, anchor="w" if column in ("label", "created") else "e")
+        y_scrollbar = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+        y_scrollbar.pack(side="right", fill="y")
+        tree.configure(yscrollcommand=y_scrollbar.set)
+        tree.pack(side="left", fill="both", expand=True)
+        def load_snapshots():
+            tree.delete(*tree.get_children())
+            for snapshot in self.controller.model.snapshot_store.snapshots():
+                tree.insert("", "end", iid=snapshot['id'], values=(
+                    snapshot['label'],
+                    snapshot['created'],
+                    snapshot['tables'],
+                    f"{snapshot['rows']:,}",
+                    f"{snapshot['raw_bytes'] / (1024 * 1024):.1f}",
+                    f"{snapshot['stored_bytes'] / (1024 * 1024):.1f}"
+                ))
+        label_frame = ttk.Frame(dialog)
+        label_frame.pack(fill="x", padx=10)
+        ttk.Label(label_frame, text="Label:").pack(side="left")
+        label_var = tk.StringVar()
+        ttk.Entry(label_frame, textvariable=label_var).pack(side="left", fill="x", expand=True, padx=5)
+        def take_snapshot():
+            if self.is_operation_running:
+                messagebox.showinfo("Operation in Progress", "An operation is already running. Please wait or click STOP.", parent=dialog)
+                return
+            self.is_operation_running = True
+            self.set_buttons_state("disabled")
+            self._start_progress_polling("Taking snapshot...")
+            threading.Thread(target=self._take_snapshot_thread, args=(label_var.get().strip() or None, load_snapshots)).start()
+        def compare_selected():
+            selected = sorted(tree.selection())
+            if len(selected) != 2:
+                messagebox.showinfo("Snapshot History", "Select exactly two snapshots to compare.", parent=dialog)
+                return
+            if self.is_operation_running:
+                messagebox.showinfo("Operation in Progress", "An operation is already running. Please wait or click STOP.", parent=dialog)
+                return
+            if self.controller.initial_state and not messagebox.askyesno(
+                    "Confirm Action", "This will replace the fetched states with the selected snapshots. Continue?", parent=dialog):
+                return
+            self.is_operation_running = True
+            self.set_buttons_state("disabled")
+            self._start_progress_polling("Loading snapshots...")
+            threading.Thread(target=self._compare_snapshots_thread, args=(selected[0], selected[1])).start()
+            dialog.destroy()
+        def delete_selected():
+            if self.is_operation_running:
+                messagebox.showinfo("Operation in Progress", "Snapshots cannot be deleted while an operation is running.", parent=dialog)
+                return
+            selected = tree.selection()
+            if not selected or not messagebox.askyesno("Confirm Delete", f"Delete {len(selected)} snapshot(s)?", parent=dialog):
+                return
+            freed = sum(self.controller.model.snapshot_store.delete(snapshot_id) for snapshot_id in selected)
+            load_snapshots()
+            self.status_var.set(f"Deleted {len(selected)} snapshot(s), freed {freed / (1024 * 1024):.1f} MB.")
+        button_frame = ttk.Frame(dialog)
+        button_frame.pack(fill="x", padx=10, pady=10)
+        ttk.Button(button_frame, text="Take Snapshot", command=take_snapshot).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Compare Selected", command=compare_selected).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Delete", command=delete_selected).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Close", command=dialog.destroy).pack(side="right", padx=5)
+        load_snapshots()
+    
+    def _take_snapshot_thread(self, label, on_saved):
+        try:
+            manifest = self.controller.take_snapshot(label, progress_callback=self._update_progress)
+            if manifest is None:
+                self.parent.after(0, self._operation_stopped)
+                return
+            def complete():
+                self._stop_progress_polling()
+                self.set_buttons_state("normal")
+                self.progress_var.set(100)
+                totals = manifest['totals']
+                self.status_var.set(
+                    f"Snapshot '{manifest['label']}' saved: {totals['rows']:,} rows, "
+                    f"{totals['new_chunks']} of {totals['chunks']} chunks new, {totals['stored_bytes'] / (1024 * 1024):.1f} MB written."
+                )
+                try:
+                    on_saved()
+                except tk.TclError:
+                    pass
+            self.parent.after(0, complete)
+        except Exception as exc:
+            error_message = str(exc)
+            self.parent.after(0, lambda: self._show_error(f"Error taking snapshot: {error_message}"))
+        finally:
+            self.parent.after(0, lambda: setattr(self, 'is_operation_running', False))
+    
+    def _compare_snapshots_thread(self, old_id, new_id):
+        try:
+            differences = self.controller.compare_snapshots(old_id, new_id, progress_callback=self._update_progress)
+            if differences is None:
+                self.parent.after(0, self._operation_stopped)
+                return
+            self.result_data = differences
+            self.filtered_data = differences
+            self.parent.after(0, self._compare_states_complete)
+        except Exception as exc:
+            error_message = str(exc)
+            self.parent.after(0, lambda: self._show_error(f"Error comparing snapshots: {error_message}"))
+        finally:
+            self.parent.after(0, lambda: setattr(self, 'is_operation_running', False))
+
     def show_about(self):
         dialog = tk.Toplevel(self.parent)
         dialog.title("About Database Comparer")
@@ -1030,18 +3711,43 @@ class DatabaseCompareView(tk.Frame):
         self.export_csv_button.config(state=state)
         self.clear_all_button.config(state=state)
     
-    def _update_progress(self, status=None, current=0, total=1, sub_progress=None):
-        if total == 0:
-            progress = 100
-        elif sub_progress is not None:
-            progress = ((current + sub_progress) / total) * 100
-        else:
-            progress = (current / total) * 100
-        self.parent.after(0, lambda: self.progress_var.set(progress))
-        if status:
-            self.parent.after(0, lambda: self.status_var.set(status))
+    def _update_progress(self, status=None, current=0, total=1, sub_progress=None, **details):
+        self.progress.update(status, current, total, sub_progress, **details)
+    
+    def _start_progress_polling(self, status):
+        self._stop_progress_polling()
+        self.progress.reset(status)
+        self._poll_progress()
+    
+    def _poll_progress(self):
+        snapshot = self.progress.snapshot()
+        self.progress_var.set(snapshot['progress'])
+        self.status_var.set(self._format_progress_status(snapshot))
+        self._progress_job = self.parent.after(self.progress_interval, self._poll_progress)
+    
+    def _stop_progress_polling(self):
+        if self._progress_job is not None:
+            self.parent.after_cancel(self._progress_job)
+            self._progress_job = None
+    
+    def _format_progress_status(self, snapshot):
+        parts = [snapshot['status']]
+        if snapshot['rows_per_sec'] > 0:
+            parts.append(f"{snapshot['rows_per_sec']:,.0f} rows/s, {snapshot['mb_per_sec']:.1f} MB/s")
+        if snapshot['table_eta'] is not None:
+            parts.append(f"table ETA {self._format_duration(snapshot['table_eta'])}")
+        if snapshot['overall_eta'] is not None:
+            parts.append(f"total ETA {self._format_duration(snapshot['overall_eta'])}")
+        return " | ".join(parts)
+    
+    def _format_duration(self, seconds):
+        seconds = int(seconds)
+        if seconds >= 3600:
+            return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+        return f"{seconds // 60}:{seconds % 60:02d}"
     
     def _show_error(self, message):
+        self._stop_progress_polling()
         self.set_buttons_state("normal")
         self.status_var.set("Error")
         self.progress_var.set(0)
@@ -1118,7 +3824,14 @@ class Application:
             del self.splash
     
     def run(self):
-        self.master.mainloop()
+        try:
+            self.master.mainloop()
+        finally:
+            if hasattr(self, 'view'):
+                try:
+                    self.view.controller.model.drop_shadow_tables(self.view.controller.initial_meta)
+                except Exception:
+                    pass
 
 def create_config_if_missing():
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -1130,13 +3843,48 @@ def create_config_if_missing():
             'database': 'test',
             'user': 'root',
             'password': '',
-            'pool_size': '5'
+            'pool_size': '5',
+            'pool_timeout': '30',
+            'fetch_workers': '1'
         }
         with open(config_path, 'w') as configfile:
             config.write(configfile)
         return True
     return False
 
+def run_watch(argv):
+    import argparse
+    parser = argparse.ArgumentParser(description="Watch tables for changes and print differences as CSV while they happen.")
+    parser.add_argument('--watch', action='store_true')
+    parser.add_argument('--config', help="Path to config.ini (defaults to the one next to this script)")
+    parser.add_argument('--tables', help="Comma-separated tables to watch; all tables when omitted")
+    parser.add_argument('--interval', type=float, help="Seconds between checks; [watch] interval when omitted")
+    parser.add_argument('--fast', action='store_true', help="Fetch changed tables in one query each (FAST MODE)")
+    args = parser.parse_args(argv)
+    controller = DatabaseController(DatabaseModel(args.config))
+    if args.tables:
+        controller.set_selected_tables([table.strip() for table in args.tables.split(',') if table.strip()])
+    controller.set_fast_mode(args.fast)
+    writer = csv.writer(sys.stdout)
+    writer.writerow(["Checked", "Table", "Key", "Change", "Column Number", "Column Name", "Old Value", "New Value"])
+    sys.stdout.flush()
+    def on_differences(differences, changed_tables):
+        checked = time.strftime('%Y-%m-%d %H:%M:%S')
+        for diff in differences:
+            writer.writerow([checked, diff['table'], diff['id'], diff.get('change_type', ''), diff['column_number'],
+                             diff['column_name'], diff['old_value'], diff['new_value']])
+        sys.stdout.flush()
+    print("Fetching baseline state...", file=sys.stderr)
+    try:
+        controller.watch(on_differences, interval=args.interval)
+    except KeyboardInterrupt:
+        controller.request_stop()
+    finally:
+        try:
+            print(f"Performance report: {controller.save_performance_report()}", file=sys.stderr)
+        except Exception as exc:
+            print(f"Could not save performance report: {exc}", file=sys.stderr)
+
 def handle_exception(exc_type, exc_value, exc_traceback):
     import traceback
     error_msg = ''.join(traceback.format_exception(exc_type, exc_value, exc_traceback))
@@ -1151,6 +3899,9 @@ def handle_exception(exc_type, exc_value, exc_traceback):
     messagebox.showerror("Application Error", f"An unexpected error occurred:\n\n{str(exc_value)}\n\nError details have been logged.")
 
 if __name__ == "__main__":
+    if '--watch' in sys.argv[1:]:
+        run_watch(sys.argv[1:])
+        sys.exit(0)
     sys.excepthook = handle_exception
     if create_config_if_missing():
         messagebox.showinfo("First Run Setup", "A default configuration file has been created. Please update the database connection settings.")
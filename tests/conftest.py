@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "config.ini"
+    path.write_text(
+        "[mysql]\n"
+        "host = localhost\n"
+        "user = test\n"
+        "password = \n"
+        "database = test\n"
+        "\n"
+        "[history]\n"
+        f"dir = {tmp_path / 'snapshots'}\n"
+    )
+    return str(path)
+
+
+@pytest.fixture
+def model(config_path):
+    from mysql_comparer import DatabaseModel
+    return DatabaseModel(config_path)
+
+
+@pytest.fixture
+def controller(model):
+    from mysql_comparer import DatabaseController
+    return DatabaseController(model)
@@ -0,0 +1,28 @@
+import pytest
+
+pytest.importorskip("mysql.connector")
+
+from mysql_comparer import BatchSizer
+
+
+def test_initial_size_is_clamped():
+    assert BatchSizer(initial_size=10, min_size=100, max_size=1000).size == 100
+    assert BatchSizer(initial_size=5000, min_size=100, max_size=1000).size == 1000
+
+
+def test_grows_at_most_twofold_per_batch():
+    sizer = BatchSizer(initial_size=1000, min_size=100, max_size=50000, target_seconds=1.0)
+    assert sizer.observe(1000, 100000, 0.01) == 2000
+    assert sizer.observe(2000, 200000, 0.02) == 4000
+
+
+def test_shrinks_to_target_time_and_byte_budget():
+    sizer = BatchSizer(initial_size=10000, min_size=100, max_size=50000, target_seconds=0.5, max_bytes=1024 * 1024)
+    assert sizer.observe(10000, 1000, 10.0) == 500
+    assert sizer.observe(500, 500 * 4096, 0.01) == 256
+    assert sizer.observe(100, 100 * 1024 * 1024, 0.01) == 100
+
+
+def test_fixed_size_ignores_observations():
+    sizer = BatchSizer(initial_size=777, adaptive=False)
+    assert sizer.observe(777, 1000, 100.0) == 777
@@ -0,0 +1,47 @@
+import pytest
+
+pytest.importorskip("mysql.connector")
+
+from mysql_comparer import ChunkCodec, CompressedTableState
+
+
+def make_state(rows, chunk_rows=10, cache_chunks=2):
+    state = CompressedTableState(ChunkCodec('zlib'), chunk_rows=chunk_rows, cache_chunks=cache_chunks)
+    for n in range(rows):
+        state[(n,)] = (n, f"row {n}", None)
+    return state
+
+
+def test_append_and_lookup_including_pending_rows():
+    state = make_state(25)
+    assert len(state) == 25
+    assert len(state.chunks) == 2
+    assert state[(3,)] == (3, "row 3", None)
+    assert state[(24,)] == (24, "row 24", None)
+    assert (25,) not in state
+    assert state.get((25,), 'missing') == 'missing'
+    state.finish()
+    assert len(state.chunks) == 3
+    assert list(state.items()) == [((n,), (n, f"row {n}", None)) for n in range(25)]
+
+
+def test_same_row_compares_digests():
+    first = make_state(20).finish()
+    second = make_state(20)
+    second[(5,)] = (5, "changed", None)
+    second.finish()
+    assert first.same_row(second, (4,))
+    assert not first.same_row(second, (5,))
+
+
+def test_round_trip_after_spill(tmp_path):
+    state = make_state(100).finish()
+    before = dict(state.items())
+    state.spill(str(tmp_path))
+    assert state.stats()['on_disk']
+    assert all(not isinstance(chunk, bytes) for chunk in state.chunks)
+    assert dict(state.items()) == before
+    state[(100,)] = (100, "after spill", None)
+    state.finish()
+    assert state[(100,)] == (100, "after spill", None)
+    assert state[(0,)] == (0, "row 0", None)
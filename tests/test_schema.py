@@ -0,0 +1,80 @@
+import pytest
+
+pytest.importorskip("mysql.connector")
+
+
+def meta(schema, key=('id',)):
+    return {'schema': schema, 'key': list(key)}
+
+
+def changes(controller, initial, current):
+    return {
+        (change['column_name'], change['old_value'], change['new_value'])
+        for change in controller._schema_differences('t', initial, current)
+    }
+
+
+BASE = [('id', 'int'), ('name', 'varchar(10)'), ('price', 'decimal(8,2)')]
+
+
+def test_identical_schema_reports_nothing(controller):
+    assert controller._schema_differences('t', meta(BASE), meta(list(BASE))) == []
+
+
+def test_added_dropped_and_retyped_columns(controller):
+    current = [('id', 'int'), ('name', 'varchar(20)'), ('created', 'datetime')]
+    assert changes(controller, meta(BASE), meta(current)) == {
+        ('price', 'decimal(8,2) (dropped)', ''),
+        ('name', 'varchar(10)', 'varchar(20)'),
+        ('created', '', 'datetime (added)')
+    }
+
+
+def test_reordered_columns(controller):
+    current = [('id', 'int'), ('price', 'decimal(8,2)'), ('name', 'varchar(10)')]
+    assert changes(controller, meta(BASE), meta(current)) == {
+        ('price', 'position 3', 'position 2'),
+        ('name', 'position 2', 'position 3')
+    }
+
+
+def test_key_change(controller):
+    current = [('id', 'int'), ('name', 'varchar(10)'), ('price', 'decimal(8,2)'), ('code', 'char(4)')]
+    assert ('key', 'id', 'code') in changes(controller, meta(BASE), meta(current, key=('code',)))
+
+
+def test_reconcile_keeps_surviving_columns_and_adds_new_ones(model, monkeypatch):
+    old = {
+        'columns': ['id', 'name', 'price'],
+        'key': ['id'],
+        'schema': BASE,
+        'digest_columns': ['name'],
+        'where': 'price > 0'
+    }
+    current_schema = [('id', 'int'), ('created', 'datetime'), ('name', 'text')]
+    current = {
+        'columns': ['id', 'created', 'name'],
+        'key': ['id'],
+        'schema': current_schema,
+        'digest_columns': ['created']
+    }
+    monkeypatch.setattr(model, 'build_table_meta', lambda table: dict(current))
+    monkeypatch.setattr(model, 'get_table_columns', lambda table: [name for name, _ in current_schema])
+    reconciled = model.reconcile_table_meta('t', old)
+    assert reconciled['columns'] == ['id', 'created', 'name']
+    assert reconciled['key'] == ['id']
+    assert reconciled['schema'] == current_schema
+    assert reconciled['digest_columns'] == ['name', 'created']
+    assert reconciled['where'] == 'price > 0'
+    assert model.reconcile_table_meta('t', dict(old, schema=current_schema)) == dict(old, schema=current_schema)
+
+
+def test_reconcile_falls_back_to_current_key_when_key_column_dropped(model, monkeypatch):
+    old = {'columns': ['id', 'name'], 'key': ['id'], 'schema': BASE[:2], 'digest_columns': []}
+    current_schema = [('uuid', 'char(36)'), ('name', 'varchar(10)')]
+    current = {'columns': ['uuid', 'name'], 'key': ['uuid'], 'schema': current_schema, 'digest_columns': []}
+    monkeypatch.setattr(model, 'build_table_meta', lambda table: dict(current))
+    monkeypatch.setattr(model, 'get_table_columns', lambda table: [name for name, _ in current_schema])
+    reconciled = model.reconcile_table_meta('t', old)
+    assert reconciled['key'] == ['uuid']
+    assert reconciled['columns'] == ['uuid', 'name']
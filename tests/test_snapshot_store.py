@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+pytest.importorskip("mysql.connector")
+
+from mysql_comparer import SnapshotStore
+
+
+def make_state(rows, offset=0):
+    return {(n,): (n, f"value {n + offset}") for n in range(rows)}
+
+
+def chunk_files(store):
+    return {
+        digest
+        for prefix in os.listdir(store.chunk_dir)
+        for digest in os.listdir(os.path.join(store.chunk_dir, prefix))
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SnapshotStore(str(tmp_path / "history"), codec_name='zlib', chunk_rows=16)
+
+
+def test_round_trip(store):
+    state = make_state(200)
+    manifest = store.save({'t': state}, {'t': ['id', 'name']}, {'t': {'key': ['id']}}, label='first')
+    states, columns, metas = store.load(manifest['id'])
+    assert states == {'t': state}
+    assert columns == {'t': ['id', 'name']}
+    assert metas == {'t': {'key': ['id']}}
+    assert [snapshot['label'] for snapshot in store.snapshots()] == ['first']
+
+
+def test_unchanged_chunks_are_shared_between_saves(store):
+    first = store.save({'t': make_state(500)}, {'t': ['id', 'name']}, {})
+    changed = make_state(500)
+    changed[(250,)] = (250, 'changed')
+    second = store.save({'t': changed}, {'t': ['id', 'name']}, {})
+    first_chunks = [chunk['hash'] for chunk in first['tables']['t']['chunks']]
+    second_chunks = [chunk['hash'] for chunk in second['tables']['t']['chunks']]
+    assert first['totals']['new_chunks'] == len(first_chunks)
+    assert 0 < second['totals']['new_chunks'] < len(second_chunks)
+    assert len(set(first_chunks) & set(second_chunks)) == len(second_chunks) - second['totals']['new_chunks']
+    assert chunk_files(store) == set(first_chunks) | set(second_chunks)
+
+
+def test_delete_keeps_chunks_shared_with_other_snapshots(store):
+    first = store.save({'t': make_state(500)}, {'t': ['id', 'name']}, {})
+    changed = make_state(500)
+    changed[(250,)] = (250, 'changed')
+    second = store.save({'t': changed}, {'t': ['id', 'name']}, {})
+    freed = store.delete(first['id'])
+    assert freed > 0
+    assert chunk_files(store) == {chunk['hash'] for chunk in second['tables']['t']['chunks']}
+    assert store.load(second['id'])[0] == {'t': changed}
+    assert [snapshot['id'] for snapshot in store.snapshots()] == [second['id']]
+
+
+def test_delete_keeps_chunks_of_a_save_in_progress(store):
+    first = store.save({'t': make_state(100)}, {'t': ['id', 'name']}, {})
+    write_chunk = store._write_chunk
+    deleted = []
+    def write_then_delete(*args):
+        chunk = write_chunk(*args)
+        if not deleted:
+            deleted.append(store.delete(first['id']))
+        return chunk
+    store._write_chunk = write_then_delete
+    second = store.save({'t': make_state(100)}, {'t': ['id', 'name']}, {})
+    assert deleted
+    assert store.load(second['id'])[0] == {'t': make_state(100)}